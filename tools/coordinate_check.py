@@ -0,0 +1,91 @@
+from itertools import islice
+
+import numpy as np
+
+from enrichment_progress import REASON_NO_INPUT, REASON_OUTSIDE_BBOX, REASON_SWAPPED_COORDINATES, REASON_ZERO_COORDINATES
+from station_columns import StationColumns
+
+GREECE_BBOX = (34.5, 19.3, 41.8, 29.7)
+SCREEN_CHUNK_SIZE = 1000
+
+
+def add_coordinate_arguments(parser) -> None:
+    parser.add_argument(
+        "--bbox",
+        type=float,
+        nargs=4,
+        default=GREECE_BBOX,
+        metavar=("MIN_LAT", "MIN_LON", "MAX_LAT", "MAX_LON"),
+        help="Coordinates outside this box are not geocoded (default: Greece)",
+    )
+    parser.add_argument(
+        "--fix-swapped",
+        action="store_true",
+        help="Swap geo_lat/geo_long back when only the swapped pair falls inside --bbox",
+    )
+
+
+def coordinate_problems(columns: StationColumns, bbox: tuple[float, float, float, float] = GREECE_BBOX) -> dict[str, str]:
+    # One vectorized pass over all rows: stationuuid -> reason for every implausible pair.
+    min_lat, min_lon, max_lat, max_lon = bbox
+    lat = columns["geo_lat"]
+    lon = columns["geo_long"]
+    present = columns.has_geo()
+    with np.errstate(invalid="ignore"):
+        zero = present & ((lat == 0) | (lon == 0))
+        inside = columns.in_bbox(*bbox)
+        flipped = (lon >= min_lat) & (lon <= max_lat) & (lat >= min_lon) & (lat <= max_lon)
+    swapped = present & ~zero & ~inside & flipped
+    outside = present & ~zero & ~inside & ~flipped
+
+    problems = {}
+    for mask, reason in (
+        (~present, REASON_NO_INPUT),
+        (zero, REASON_ZERO_COORDINATES),
+        (swapped, REASON_SWAPPED_COORDINATES),
+        (outside, REASON_OUTSIDE_BBOX),
+    ):
+        for station_id in columns.select(mask):
+            problems[station_id] = reason
+    return problems
+
+
+def _chunks(stations, size: int):
+    iterator = iter(stations)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def screen_stations(
+    stations,
+    store,
+    progress,
+    bbox=GREECE_BBOX,
+    fix_swapped: bool = False,
+    chunk_size: int = SCREEN_CHUNK_SIZE,
+    flagged: set | None = None,
+):
+    # Marks implausible coordinates in the progress file (or repairs swaps) and yields the stations that may be geocoded.
+    # Works chunk by chunk so a streamed dataset is never held in memory; the summary prints once it is exhausted.
+    # `flagged` collects the ids marked here, so callers can keep them out of the work queue.
+    counts: dict[str, int] = {}
+    for chunk in _chunks(stations, chunk_size):
+        problems = coordinate_problems(StationColumns.from_stations(chunk), tuple(bbox))
+        for station in chunk:
+            reason = problems.get(station.get("stationuuid"))
+            if reason is None:
+                yield station
+                continue
+            if reason == REASON_SWAPPED_COORDINATES and fix_swapped:
+                store.update(station, geo_lat=station.get("geo_long"), geo_long=station.get("geo_lat"))
+                store.checkpoint()
+                yield station
+                reason = "repaired-swap"
+            else:
+                progress.mark(station, reason)
+                if flagged is not None:
+                    flagged.add(station.get("stationuuid"))
+            counts[reason] = counts.get(reason, 0) + 1
+        progress.save()
+    if counts:
+        print("Coordinate check: " + ", ".join(f"{reason}={count}" for reason, count in sorted(counts.items())))
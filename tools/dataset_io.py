@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+from station_json import encode_station
+
+STREAM_CHUNK_SIZE = 1 << 16
+
+
+def temp_path_for(path: Path) -> Path:
+    return path.with_name(f".{path.name}.tmp")
+
+
+def backup_path_for(path: Path) -> Path:
+    return path.with_name(f".{path.name}.bak")
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: Path, text: str, keep_backup: bool = False) -> None:
+    atomic_write_chunks(path, (text,), keep_backup)
+
+
+def atomic_write_chunks(path: Path, chunks, keep_backup: bool = False) -> None:
+    tmp_path = temp_path_for(path)
+    with tmp_path.open("w", encoding="utf-8", newline="\n") as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    if keep_backup and path.exists():
+        backup = backup_path_for(path)
+        backup.unlink(missing_ok=True)
+        try:
+            os.link(path, backup)
+        except OSError:
+            shutil.copy2(path, backup)
+
+    os.replace(tmp_path, path)
+    _fsync_dir(path.parent)
+
+
+def read_json_recovering(path: Path, object_hook=None):
+    tmp_path = temp_path_for(path)
+    if tmp_path.exists():
+        # Left over from a write that never reached the rename; the target is still intact.
+        tmp_path.unlink()
+
+    try:
+        return json.loads(path.read_text(encoding="utf-8"), object_hook=object_hook)
+    except json.JSONDecodeError as exc:
+        backup = backup_path_for(path)
+        if not backup.exists():
+            raise
+        try:
+            payload = json.loads(backup.read_text(encoding="utf-8"), object_hook=object_hook)
+        except json.JSONDecodeError:
+            raise exc from None
+        print(f"{path} is corrupt ({exc}); restoring last good copy from {backup}")
+        atomic_write_text(path, backup.read_text(encoding="utf-8"))
+        return payload
+
+
+def iter_json_array(path: Path, chunk_size: int = STREAM_CHUNK_SIZE):
+    decoder = json.JSONDecoder()
+    with path.open("r", encoding="utf-8") as handle:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, pos, eof
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace() -> None:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    return
+
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] != "[":
+            raise ValueError(f"{path} does not contain a JSON array")
+        pos += 1
+
+        expect_value = True
+        after_comma = False
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError(f"Unexpected end of {path}")
+            char = buffer[pos]
+            if char == "]":
+                # Hold the stream to what json.load (and the site build) accepts.
+                if after_comma:
+                    raise ValueError(f"Trailing ',' before ']' in {path}")
+                pos += 1
+                skip_whitespace()
+                if pos < len(buffer):
+                    raise ValueError(f"Unexpected data after the closing ']' in {path}")
+                return
+            if char == ",":
+                if expect_value:
+                    raise ValueError(f"Unexpected ',' in {path}")
+                expect_value = True
+                after_comma = True
+                pos += 1
+                continue
+            if not expect_value:
+                raise ValueError(f"Expected ',' or ']' in {path}")
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof or not fill():
+                        raise
+                    continue
+                # A scalar cut off at a chunk boundary would decode "successfully"; records are objects.
+                if not isinstance(record, (dict, list)) and end >= len(buffer) and not eof:
+                    if fill():
+                        continue
+                break
+            pos = end
+            expect_value = False
+            after_comma = False
+            yield record
+
+
+def iter_stations(path: Path):
+    for record in iter_json_array(path):
+        if isinstance(record, dict):
+            yield record
+
+
+def dump_stations_chunks(stations):
+    first = True
+    for station in stations:
+        yield ("[\n" if first else ",\n") + encode_station(station)
+        first = False
+    yield "[]\n" if first else "\n]\n"
+
+
+def rewrite_stations(path: Path, transform, keep_backup: bool = True) -> None:
+    # Streams the old file into a sibling temp file; memory stays bounded by one record.
+    atomic_write_chunks(path, dump_stations_chunks(transform(station) for station in iter_stations(path)), keep_backup)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import subprocess
+import sys
+
+from station_diff import diff_stations, load_version, touched_ids
+from station_store import DATA_PATH
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare two versions of the station dataset by stationuuid and report per-field changes."
+    )
+    parser.add_argument(
+        "old",
+        nargs="?",
+        default=f"HEAD:{DATA_PATH.as_posix()}",
+        help=f"Old version: file path or git REV:path (default: HEAD:{DATA_PATH.as_posix()})",
+    )
+    parser.add_argument("new", nargs="?", default=str(DATA_PATH), help=f"New version (default: {DATA_PATH})")
+    parser.add_argument("--field", action="append", help="Only compare this field (can be repeated)")
+    parser.add_argument(
+        "--format",
+        choices=("text", "json", "ids"),
+        default="text",
+        help="text summary, full JSON report, or one added/changed stationuuid per line (default: text)",
+    )
+    args = parser.parse_args()
+
+    try:
+        old = load_version(args.old)
+        new = load_version(args.new)
+    except (OSError, subprocess.CalledProcessError, json.JSONDecodeError) as exc:
+        print(f"Failed to load dataset: {exc}", file=sys.stderr)
+        return 1
+
+    fields = tuple(args.field) if args.field else None
+    diff = diff_stations(old, new, fields)
+
+    if args.format == "json":
+        print(json.dumps(diff, ensure_ascii=False, indent=2))
+    elif args.format == "ids":
+        for station_id in touched_ids(diff, fields):
+            print(station_id)
+    else:
+        summary = diff["summary"]
+        print(f"Stations: {summary['old']} -> {summary['new']}")
+        print(f"Added: {summary['added']}  Removed: {summary['removed']}  Changed: {summary['changed']}")
+        for field, count in summary["fields"].items():
+            print(f"  {field}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
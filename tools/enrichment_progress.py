@@ -0,0 +1,283 @@
+import hashlib
+import json
+import socket
+import time
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+
+from dataset_io import atomic_write_text
+
+GEO_INPUTS = ("geo_lat", "geo_long")
+HOMEPAGE_INPUTS = ("homepage",)
+LOCATION_INPUTS = ("state", "city")
+DEFAULT_COMPACT_EVERY = 500
+DEFAULT_CHECKPOINT_EVERY = 25
+
+REASON_DONE = "done"
+REASON_NO_INPUT = "no-input"
+REASON_NO_MATCH = "no-match"
+REASON_GONE = "gone"
+REASON_ERROR = "error"
+REASON_ZERO_COORDINATES = "zero-coordinates"
+REASON_SWAPPED_COORDINATES = "swapped-coordinates"
+REASON_OUTSIDE_BBOX = "outside-bbox"
+# Entries from before reasons were recorded; they may hold failures, so they are retried like one.
+REASON_LEGACY = "legacy"
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# reason -> (first retry delay, max delay) in seconds; None never retries while the inputs are unchanged.
+RETRY_POLICY = {
+    REASON_DONE: None,
+    REASON_NO_INPUT: None,
+    REASON_NO_MATCH: (30 * DAY, 30 * DAY),
+    REASON_GONE: (14 * DAY, 90 * DAY),
+    REASON_ERROR: (HOUR, 7 * DAY),
+    REASON_ZERO_COORDINATES: None,
+    REASON_SWAPPED_COORDINATES: None,
+    REASON_OUTSIDE_BBOX: None,
+    REASON_LEGACY: (30 * DAY, 30 * DAY),
+}
+
+
+def station_fingerprint(station, fields: tuple[str, ...]) -> str:
+    payload = json.dumps([station.get(field) for field in fields], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def classify_error(exc: BaseException) -> str:
+    if isinstance(exc, HTTPError):
+        return REASON_ERROR if exc.code == 429 or exc.code >= 500 else REASON_GONE
+    if isinstance(exc, (URLError, socket.timeout, ConnectionError)):
+        return REASON_ERROR
+    if isinstance(exc, ValueError):
+        # The endpoint answered but with nothing usable (wrong content type, undecodable body).
+        return REASON_NO_MATCH
+    return REASON_ERROR
+
+
+def retry_at(entry: dict) -> float | None:
+    policy = RETRY_POLICY.get(entry.get("reason"))
+    if policy is None or entry.get("at") is None:
+        return None
+    first, cap = policy
+    attempts = max(int(entry.get("attempts") or 1), 1)
+    return entry["at"] + min(first * 2 ** (attempts - 1), cap)
+
+
+def log_path_for(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.log.jsonl")
+
+
+def cursor_path_for(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.cursor.json")
+
+
+def _entry(value) -> dict | None:
+    # Older progress files stored a bare fingerprint, or only listed the uuid (None).
+    if value is None or isinstance(value, str):
+        return {"fp": value, "reason": REASON_LEGACY, "attempts": 1, "at": None}
+    if isinstance(value, dict):
+        return {
+            "fp": value.get("fp"),
+            "reason": value.get("reason") or REASON_LEGACY,
+            "attempts": value.get("attempts") or 1,
+            "at": value.get("at"),
+        }
+    return None
+
+
+class ProgressFile:
+    def __init__(self, path: Path, fields: tuple[str, ...], compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.path = path
+        self.log_path = log_path_for(path)
+        self.fields = fields
+        self.compact_every = compact_every
+        # stationuuid -> {"fp", "reason", "attempts", "at"} describing the last attempt on that station.
+        self.entries: dict[str, dict] = {}
+        # Called with (stationuuid, "<task>:<reason>" or None) on every change, e.g. StationDBStore.record_status.
+        self.on_mark = None
+        self._log = None
+        self._logged = 0
+
+    @classmethod
+    def load(cls, path: Path, fields: tuple[str, ...], compact_every: int = DEFAULT_COMPACT_EVERY) -> "ProgressFile":
+        progress = cls(path, fields, compact_every)
+        if path.exists():
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except Exception:
+                payload = None
+            if isinstance(payload, list):
+                payload = {station_id: None for station_id in payload}
+            if isinstance(payload, dict):
+                for station_id, value in payload.items():
+                    entry = _entry(value)
+                    if isinstance(station_id, str) and entry is not None:
+                        progress.entries[station_id] = entry
+        progress._replay_log()
+        return progress
+
+    def _replay_log(self) -> None:
+        if not self.log_path.exists():
+            return
+        with self.log_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Only the last line can be torn by a crash.
+                    break
+                station_id = record.get("id") if isinstance(record, dict) else None
+                if not isinstance(station_id, str):
+                    continue
+                if record.get("drop"):
+                    self.entries.pop(station_id, None)
+                else:
+                    self.entries[station_id] = _entry(record)
+                self._logged += 1
+
+    def _append(self, record: dict) -> None:
+        if self._log is None:
+            self._log = self.log_path.open("a", encoding="utf-8")
+        self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._logged += 1
+
+    def __contains__(self, station_id: str) -> bool:
+        return station_id in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __bool__(self) -> bool:
+        return bool(self.entries)
+
+    @property
+    def task(self) -> str:
+        return self.path.stem.removesuffix("-progress")
+
+    def fingerprint(self, station) -> str:
+        return station_fingerprint(station, self.fields)
+
+    def is_done(self, station, now: float | None = None) -> bool:
+        station_id = station.get("stationuuid")
+        entry = self.entries.get(station_id)
+        if entry is None:
+            return False
+        current = self.fingerprint(station)
+        if entry["at"] is None:
+            # Legacy entries carry no timestamp (and the old list format no fingerprint): start their TTL now.
+            if entry["fp"] is None:
+                entry["fp"] = current
+            entry["at"] = int(time.time() if now is None else now)
+            self._append({"id": station_id, **entry})
+        if entry["fp"] != current:
+            return False
+        due = retry_at(entry)
+        return due is None or (time.time() if now is None else now) < due
+
+    def reason(self, station_id: str) -> str | None:
+        entry = self.entries.get(station_id)
+        return entry["reason"] if entry is not None else None
+
+    def mark(self, station, reason: str = REASON_DONE) -> None:
+        station_id = station.get("stationuuid")
+        fingerprint = self.fingerprint(station)
+        previous = self.entries.get(station_id)
+        attempts = 1
+        if previous is not None and previous["fp"] == fingerprint and previous["reason"] == reason:
+            attempts = int(previous["attempts"] or 1) + 1
+        entry = {"fp": fingerprint, "reason": reason, "attempts": attempts, "at": int(time.time())}
+        self.entries[station_id] = entry
+        self._append({"id": station_id, **entry})
+        if self.on_mark is not None:
+            self.on_mark(station_id, f"{self.task}:{reason}")
+
+    def discard(self, station_id: str) -> None:
+        if station_id not in self.entries:
+            return
+        del self.entries[station_id]
+        self._append({"id": station_id, "drop": True})
+        if self.on_mark is not None:
+            self.on_mark(station_id, None)
+
+    def reasons(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for entry in self.entries.values():
+            reason = entry["reason"]
+            counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+    def save(self) -> None:
+        if self._log is not None:
+            self._log.flush()
+        if self.compact_every > 0 and self._logged >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if not self._logged and self.path.exists():
+            return
+        atomic_write_text(self.path, json.dumps(dict(sorted(self.entries.items())), ensure_ascii=False, indent=2) + "\n")
+        self.log_path.unlink(missing_ok=True)
+        self._logged = 0
+
+
+class RunCursor:
+    # position counts stations already examined; station_id is the one at position - 1 and detects a reordered dataset.
+    def __init__(self, path: Path, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.position = 0
+        self.station_id: str | None = None
+        self._saved = 0
+
+    @classmethod
+    def for_progress(cls, progress_path: Path, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY) -> "RunCursor":
+        cursor = cls(cursor_path_for(progress_path), checkpoint_every)
+        if cursor.path.exists():
+            try:
+                payload = json.loads(cursor.path.read_text(encoding="utf-8"))
+            except Exception:
+                payload = None
+            if isinstance(payload, dict) and isinstance(payload.get("position"), int):
+                cursor.position = payload["position"]
+                cursor.station_id = payload.get("stationuuid")
+        cursor._saved = cursor.position
+        return cursor
+
+    def resume(self, stations):
+        start = self.position
+        if start > 0:
+            iterator = iter(stations)
+            for index, station in enumerate(iterator):
+                if index == start - 1:
+                    if station.get("stationuuid") == self.station_id:
+                        print(f"Resuming after station #{start} ({self.station_id})")
+                        yield from enumerate(iterator, start)
+                        return
+                    break
+            print("Saved cursor does not match the dataset; starting from the beginning.")
+        yield from enumerate(stations)
+
+    def advance(self, index: int, station) -> None:
+        self.position = index + 1
+        self.station_id = station.get("stationuuid")
+        if self.checkpoint_every > 0 and self.position - self._saved >= self.checkpoint_every:
+            self.save()
+
+    def save(self) -> None:
+        if self.position == self._saved:
+            return
+        payload = {"position": self.position, "stationuuid": self.station_id, "at": int(time.time())}
+        atomic_write_text(self.path, json.dumps(payload, ensure_ascii=False) + "\n")
+        self._saved = self.position
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.position = 0
+        self.station_id = None
+        self._saved = 0
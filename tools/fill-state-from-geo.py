@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
 import argparse
-import json
 import re
 import sys
-import time
 from pathlib import Path
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
-DATA_PATH = Path("src/data/stations-gr.json")
+from coordinate_check import add_coordinate_arguments, screen_stations
+from enrichment_progress import GEO_INPUTS, REASON_DONE, REASON_NO_INPUT, REASON_NO_MATCH, ProgressFile, classify_error
+from gazetteer import DEFAULT_CITY_RADIUS_KM, DEFAULT_CITY_RATIO, DEFAULT_GAZETTEER_PATH, Gazetteer
+from geocode import ReverseGeocoder, add_geocode_arguments, station_coordinates
+from station_store import DATA_PATH, add_store_arguments, open_store
+from work_queue import WorkQueue, add_order_argument
+
 DEFAULT_PROGRESS_PATH = Path("tools/state-geo-progress.json")
-USER_AGENT = "Mozilla/5.0 (compatible; E-RadioBot/1.0; +https://e-radio.github.io)"
-NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+OVERWRITE_REASONS = (REASON_DONE, REASON_NO_MATCH)
 
 CITY_PRIORITY = (
     "city",
@@ -55,25 +56,6 @@ CLEAN_SUFFIXES = (
 )
 
 
-def reverse_geocode(lat: float, lon: float, language: str) -> dict:
-    query = urlencode(
-        {
-            "format": "jsonv2",
-            "lat": f"{lat:.6f}",
-            "lon": f"{lon:.6f}",
-            "addressdetails": "1",
-            "accept-language": language,
-        }
-    )
-    url = f"{NOMINATIM_URL}?{query}"
-    req = Request(url, headers={"User-Agent": USER_AGENT})
-    with urlopen(req, timeout=20) as resp:
-        content_type = resp.headers.get("Content-Type", "")
-        if "application/json" not in content_type:
-            raise ValueError(f"Unsupported content-type: {content_type}")
-        return json.loads(resp.read(1024 * 1024).decode("utf-8", errors="ignore"))
-
-
 def clean_name(value: str) -> str:
     cleaned = " ".join(value.strip().split())
 
@@ -116,19 +98,19 @@ def main() -> int:
     parser.add_argument(
         "--sleep",
         type=float,
-        default=1.0,
-        help="Seconds to sleep between requests (default: 1.0 for Nominatim)",
+        default=None,
+        help="Seconds between Nominatim requests; same as --rate 1/SLEEP",
     )
     parser.add_argument(
         "--progress-file",
         type=Path,
         default=DEFAULT_PROGRESS_PATH,
-        help="Path to progress file for skipped stations",
+        help="Path to progress file for processed stations",
     )
     parser.add_argument(
         "--overwrite",
         action="store_true",
-        help="Overwrite existing city/state values (default: only fill missing)",
+        help="Overwrite existing city/state values and redo stations already in the progress file (default: only fill missing)",
     )
     parser.add_argument(
         "--lang",
@@ -136,89 +118,147 @@ def main() -> int:
         default="en",
         help="Reverse-geocode language (default: en)",
     )
+    parser.add_argument(
+        "--gazetteer",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_GAZETTEER_PATH,
+        help=f"Try city centres from this gazetteer before Nominatim (off by default; bare flag uses {DEFAULT_GAZETTEER_PATH})",
+    )
+    parser.add_argument(
+        "--city-radius-km",
+        type=float,
+        default=DEFAULT_CITY_RADIUS_KM,
+        help=f"Max distance to the nearest gazetteer city (default: {DEFAULT_CITY_RADIUS_KM:g})",
+    )
+    parser.add_argument(
+        "--city-ratio",
+        type=float,
+        default=DEFAULT_CITY_RATIO,
+        help=(
+            "Only accept the nearest city when it is at most this fraction of the distance to the second nearest "
+            f"(default: {DEFAULT_CITY_RATIO:g})"
+        ),
+    )
+    add_coordinate_arguments(parser)
+    add_order_argument(parser)
+    add_geocode_arguments(parser)
+    add_store_arguments(parser)
     args = parser.parse_args()
 
     if not DATA_PATH.exists():
         print(f"Data file not found: {DATA_PATH}")
         return 1
+    if args.gazetteer is not None and not args.gazetteer.exists():
+        print(f"Gazetteer not found: {args.gazetteer}")
+        return 1
 
-    data = json.loads(DATA_PATH.read_text(encoding="utf-8"))
+    store = open_store(DATA_PATH, args)
     processed = 0
     max_items = args.max if args.max and args.max > 0 else float("inf")
 
-    skipped = set()
-    if args.progress_file.exists():
-        try:
-            skipped = set(json.loads(args.progress_file.read_text(encoding="utf-8")))
-        except Exception:
-            skipped = set()
+    progress = ProgressFile.load(args.progress_file, GEO_INPUTS)
+    progress.on_mark = store.record_status
+    geocoder = ReverseGeocoder.from_args(args)
+
+    def needs_update(station) -> bool:
+        if args.overwrite:
+            return True
+        return station.get("city") in (None, "") or station.get("state") in (None, "")
+
+    def candidates():
+        return store if args.overwrite else store.missing("city", "state")
+
+    # Stations the coordinate screen marked this run; never geocoded, even with --overwrite.
+    flagged: set[str] = set()
+
+    def is_pending(station) -> bool:
+        if station.get("stationuuid") in flagged or not needs_update(station):
+            return False
+        if not progress.is_done(station):
+            return True
+        # --overwrite redoes finished lookups only; screened coordinates and pending retries keep their reasons.
+        return args.overwrite and progress.reason(station.get("stationuuid")) in OVERWRITE_REASONS
+
+    gazetteer = Gazetteer.load(args.gazetteer) if args.gazetteer is not None else None
+    # stationuuid -> gazetteer entry for stations close enough to a known city to skip Nominatim.
+    nearby_cities = {}
+
+    def unmatched(stations):
+        for station in stations:
+            coordinates = station_coordinates(station)
+            entry = gazetteer.nearest(*coordinates, args.city_radius_km, args.city_ratio) if gazetteer and coordinates else None
+            if entry is None:
+                yield station
+            else:
+                nearby_cities[station.get("stationuuid")] = entry
+
+    # One pass screens coordinates, matches the gazetteer and clusters whatever is left for Nominatim.
+    screened = screen_stations(
+        filter(is_pending, candidates()), store, progress, args.bbox, args.fix_swapped, flagged=flagged
+    )
+    geocoder.cluster(unmatched(screened), args.cluster_precision)
+    if gazetteer is not None:
+        print(f"Stations within {args.city_radius_km:g} km of a gazetteer city: {len(nearby_cities)}")
+    queue = WorkQueue.from_args(candidates(), is_pending, args)
+    print(queue.describe())
+    if progress:
+        print("Previous attempts: " + ", ".join(f"{reason}={count}" for reason, count in sorted(progress.reasons().items())))
 
     try:
         while processed < max_items:
-            target = None
-            for station in data:
-                has_city = station.get("city") not in (None, "")
-                has_state = station.get("state") not in (None, "")
-                needs_city = args.overwrite or not has_city
-                needs_state = args.overwrite or not has_state
-                if not (needs_city or needs_state):
-                    continue
-                if station.get("stationuuid") in skipped:
-                    continue
-                target = station
-                break
-
+            target = queue.pop()
             if not target:
                 print("No more stations to process.")
                 return 0
 
+            needs_city = args.overwrite or target.get("city") in (None, "")
+            needs_state = args.overwrite or target.get("state") in (None, "")
+
             lat = target.get("geo_lat")
             lon = target.get("geo_long")
             if lat in (None, "") or lon in (None, ""):
                 print(f"Missing geo coordinates for station: {target.get('name')} ({target.get('stationuuid')})")
-                skipped.add(target.get("stationuuid"))
-                args.progress_file.write_text(
-                    json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n",
-                    encoding="utf-8",
-                )
+                progress.mark(target, REASON_NO_INPUT)
+                progress.save()
                 continue
 
             print(f"Checking: {target.get('name')} ({target.get('stationuuid')})")
             print(f"Geo: {lat}, {lon}")
 
-            try:
-                payload = reverse_geocode(float(lat), float(lon), args.lang)
-            except Exception as exc:
-                print(f"Failed to reverse-geocode: {exc}")
-                skipped.add(target.get("stationuuid"))
-                args.progress_file.write_text(
-                    json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n",
-                    encoding="utf-8",
-                )
-                continue
+            nearest = nearby_cities.get(target.get("stationuuid"))
+            if nearest is not None:
+                print(f"Nearest gazetteer city: {nearest['name']}")
+                city = nearest["name"] if needs_city else None
+                state = nearest.get("region") if needs_state else None
+            else:
+                try:
+                    address = geocoder.lookup_station(target)
+                except Exception as exc:
+                    print(f"Failed to reverse-geocode: {exc}")
+                    progress.mark(target, classify_error(exc))
+                    progress.save()
+                    continue
 
-            address = payload.get("address") or {}
-            city = pick_from_address(address, CITY_PRIORITY) if needs_city else None
-            state = pick_from_address(address, STATE_PRIORITY) if needs_state else None
+                city = pick_from_address(address, CITY_PRIORITY) if needs_city else None
+                state = pick_from_address(address, STATE_PRIORITY) if needs_state else None
 
-            updated_any = False
+            updates = {}
             if city:
-                target["city"] = city
-                updated_any = True
+                updates["city"] = city
             if state:
-                target["state"] = state
-                updated_any = True
+                updates["state"] = state
 
-            if not updated_any:
+            if not updates:
                 print("No suitable address field found. No changes made.")
-                skipped.add(target.get("stationuuid"))
-                args.progress_file.write_text(
-                    json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n",
-                    encoding="utf-8",
-                )
+                progress.mark(target, REASON_NO_MATCH)
+                progress.save()
                 continue
 
-            DATA_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            store.update(target, **updates)
+            store.checkpoint()
+            progress.mark(target, REASON_DONE)
+            progress.save()
             if city and state:
                 print(f"✓ Updated city to: {city}")
                 print(f"✓ Updated state to: {state}")
@@ -227,16 +267,13 @@ def main() -> int:
             elif state:
                 print(f"✓ Updated state to: {state}")
             processed += 1
-
-            if args.sleep > 0 and processed < max_items:
-                time.sleep(args.sleep)
     except KeyboardInterrupt:
         print("Interrupted. Progress saved.")
-        args.progress_file.write_text(
-            json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n",
-            encoding="utf-8",
-        )
         return 130
+    finally:
+        store.compact()
+        progress.compact()
+        geocoder.close()
 
     return 0
 
@@ -3,23 +3,24 @@ import argparse
 import json
 import re
 import sys
-import time
 from pathlib import Path
-from urllib.request import Request, urlopen
 
-DATA_PATH = Path("src/data/stations-gr.json")
+import http_client
+from enrichment_progress import HOMEPAGE_INPUTS, REASON_NO_INPUT, REASON_NO_MATCH, ProgressFile, classify_error
+from rate_limit import TokenBucket
+from station_store import DATA_PATH, add_store_arguments, open_store
+from work_queue import WorkQueue, add_order_argument
+
 DEFAULT_PROGRESS_PATH = Path("tools/state-fill-progress.json")
 USER_AGENT = "Mozilla/5.0 (compatible; E-RadioBot/1.0; +https://e-radio.github.io)"
 
 
 def fetch_html(url: str) -> str:
-    req = Request(url, headers={"User-Agent": USER_AGENT})
-    with urlopen(req, timeout=20) as resp:
-        content_type = resp.headers.get("Content-Type", "")
-        if not any(token in content_type for token in ("text/html", "application/xhtml+xml", "application/json", "text/plain")):
-            raise ValueError(f"Unsupported content-type: {content_type}")
-        charset = resp.headers.get_content_charset() or "utf-8"
-        return resp.read(1024 * 1024).decode(charset, errors="ignore")
+    resp = http_client.get(url, {"User-Agent": USER_AGENT})
+    content_type = resp.headers.get("Content-Type", "")
+    if not any(token in content_type for token in ("text/html", "application/xhtml+xml", "application/json", "text/plain")):
+        raise ValueError(f"Unsupported content-type: {content_type}")
+    return resp.text()
 
 
 def extract_jsonld_blocks(html: str):
@@ -83,40 +84,39 @@ def pick_state_from_jsonld(objects):
 def main():
     parser = argparse.ArgumentParser(description="Fill missing station state from homepage JSON-LD.")
     parser.add_argument("--max", type=int, default=0, help="Max stations to process in one run (0 = no limit)")
-    parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to sleep between stations (default: 0)")
+    parser.add_argument("--sleep", type=float, default=0.0, help="Minimum seconds between homepage fetches (default: 0)")
     parser.add_argument(
         "--progress-file",
         type=Path,
         default=DEFAULT_PROGRESS_PATH,
         help="Path to progress file for skipped stations",
     )
+    add_order_argument(parser)
+    add_store_arguments(parser)
     args = parser.parse_args()
 
     if not DATA_PATH.exists():
         print(f"Data file not found: {DATA_PATH}")
         return 1
 
-    data = json.loads(DATA_PATH.read_text(encoding="utf-8"))
+    store = open_store(DATA_PATH, args)
     processed = 0
     max_items = args.max if args.max and args.max > 0 else float("inf")
 
-    skipped = set()
-    if args.progress_file.exists():
-        try:
-            skipped = set(json.loads(args.progress_file.read_text(encoding="utf-8")))
-        except Exception:
-            skipped = set()
+    progress = ProgressFile.load(args.progress_file, HOMEPAGE_INPUTS)
+    progress.on_mark = store.record_status
+    limiter = TokenBucket(1 / args.sleep if args.sleep > 0 else 0)
+
+    queue = WorkQueue.from_args(store.missing("state"), lambda station: not progress.is_done(station), args)
+    print(queue.describe())
+    if progress:
+        print("Previous attempts: " + ", ".join(f"{reason}={count}" for reason, count in sorted(progress.reasons().items())))
 
     try:
         while processed < max_items:
-            target = None
-            for station in data:
-                if station.get("state") in (None, "") and station.get("stationuuid") not in skipped:
-                    target = station
-                    break
-
+            target = queue.pop()
             if not target:
-                if skipped:
+                if progress:
                     print("No more unprocessed stations with state: null found.")
                 else:
                     print("No stations with state: null found.")
@@ -125,19 +125,20 @@ def main():
             homepage = (target.get("homepage") or "").strip()
             if not homepage:
                 print(f"Missing homepage for station: {target.get('name')} ({target.get('stationuuid')})")
-                skipped.add(target.get("stationuuid"))
-                args.progress_file.write_text(json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+                progress.mark(target, REASON_NO_INPUT)
+                progress.save()
                 continue
 
             print(f"Checking: {target.get('name')} ({target.get('stationuuid')})")
             print(f"Homepage: {homepage}")
 
             try:
+                limiter.acquire()
                 html = fetch_html(homepage)
             except Exception as exc:
                 print(f"Failed to fetch homepage: {exc}")
-                skipped.add(target.get("stationuuid"))
-                args.progress_file.write_text(json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+                progress.mark(target, classify_error(exc))
+                progress.save()
                 continue
 
             jsonld = extract_jsonld_blocks(html)
@@ -145,21 +146,20 @@ def main():
 
             if not state:
                 print("No state found in application/ld+json. No changes made.")
-                skipped.add(target.get("stationuuid"))
-                args.progress_file.write_text(json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+                progress.mark(target, REASON_NO_MATCH)
+                progress.save()
                 continue
 
-            target["state"] = state
-            DATA_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            store.update(target, state=state)
+            store.checkpoint()
             print(f"✓ Updated state to: {state}")
             processed += 1
-
-            if args.sleep > 0 and processed < max_items:
-                time.sleep(args.sleep)
     except KeyboardInterrupt:
         print("Interrupted. Progress saved.")
-        args.progress_file.write_text(json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
         return 130
+    finally:
+        store.compact()
+        progress.compact()
 
     return 0
 
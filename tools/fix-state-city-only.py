@@ -4,25 +4,14 @@ import json
 import sys
 from pathlib import Path
 
-DATA_PATH = Path("src/data/stations-gr.json")
+from enrichment_progress import LOCATION_INPUTS, REASON_NO_MATCH, ProgressFile
+from station_schema import REGIONS
+from station_store import DATA_PATH, add_store_arguments, open_store
+from work_queue import add_order_argument, prioritize, resolve_order
+
 DEFAULT_PROGRESS_PATH = Path("tools/state-city-only-progress.json")
 CITY_REGION_MAP_PATH = Path("tools/city-region-map.json")
 
-REGIONS = (
-    "Attica",
-    "Central Macedonia",
-    "Western Macedonia",
-    "Eastern Macedonia and Thrace",
-    "Thessaly",
-    "Epirus",
-    "Western Greece",
-    "Central Greece",
-    "Peloponnese",
-    "North Aegean",
-    "South Aegean",
-    "Ionian Islands",
-    "Crete",
-)
 
 def normalize_text(value: str) -> str:
     cleaned = value.strip().lower()
@@ -61,28 +50,26 @@ def main() -> int:
         default=DEFAULT_PROGRESS_PATH,
         help="Path to progress file for skipped stations",
     )
+    add_order_argument(parser)
+    add_store_arguments(parser)
     args = parser.parse_args()
 
     if not DATA_PATH.exists():
         print(f"Data file not found: {DATA_PATH}")
         return 1
 
-    data = json.loads(DATA_PATH.read_text(encoding="utf-8"))
+    store = open_store(DATA_PATH, args)
     processed = 0
     max_items = args.max if args.max and args.max > 0 else float("inf")
 
     city_region_map = load_city_region_map(CITY_REGION_MAP_PATH)
     unknown_cities = set()
 
-    skipped = set()
-    if args.progress_file.exists():
-        try:
-            skipped = set(json.loads(args.progress_file.read_text(encoding="utf-8")))
-        except Exception:
-            skipped = set()
+    progress = ProgressFile.load(args.progress_file, LOCATION_INPUTS)
+    progress.on_mark = store.record_status
 
     try:
-        for station in data:
+        for station in prioritize(store.missing("city"), resolve_order(args)):
             if processed >= max_items:
                 break
 
@@ -98,7 +85,7 @@ def main() -> int:
                 continue
 
             city_lookup = normalize_text(state_value)
-            if station_id in skipped and city_lookup not in city_region_map:
+            if progress.is_done(station) and city_lookup not in city_region_map:
                 continue
 
             print(f"Checking: {station.get('name')} ({station_id})")
@@ -107,32 +94,26 @@ def main() -> int:
             region = city_region_map.get(city_lookup)
             if not region:
                 unknown_cities.add(city)
-                skipped.add(station_id)
+                progress.mark(station, REASON_NO_MATCH)
                 continue
             if region not in REGIONS:
                 print(f"Invalid region in map for city '{city}': {region}")
-                skipped.add(station_id)
+                progress.mark(station, REASON_NO_MATCH)
                 continue
 
-            station["city"] = city
-            station["state"] = region
-            DATA_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            store.update(station, city=city, state=region)
+            store.checkpoint()
             print(f"✓ Updated city to: {station['city']}")
             print(f"✓ Updated state to: {region}")
             processed += 1
-            skipped.discard(station_id)
+            progress.discard(station_id)
     except KeyboardInterrupt:
         print("Interrupted. Progress saved.")
-        args.progress_file.write_text(
-            json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n",
-            encoding="utf-8",
-        )
         return 130
+    finally:
+        store.compact()
+        progress.compact()
 
-    args.progress_file.write_text(
-        json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n",
-        encoding="utf-8",
-    )
     if unknown_cities:
         unknown_path = Path("tools/state-city-only-unknown.json")
         unknown_path.write_text(
@@ -1,39 +1,33 @@
 #!/usr/bin/env python3
 import argparse
-import json
 import re
 import sys
-import time
 from pathlib import Path
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
-DATA_PATH = Path("src/data/stations-gr.json")
-DEFAULT_PROGRESS_PATH = Path("tools/state-region-progress.json")
-USER_AGENT = "Mozilla/5.0 (compatible; E-RadioBot/1.0; +https://e-radio.github.io)"
-NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
-
-REGIONS = (
-    "Attica",
-    "Central Macedonia",
-    "West Macedonia",
-    "East Macedonia and Thrace",
-    "Thessaly",
-    "Epirus",
-    "Western Greece",
-    "Central Greece",
-    "Peloponnese",
-    "North Aegean",
-    "South Aegean",
-    "Ionian Islands",
-    "Crete",
+from coordinate_check import add_coordinate_arguments, screen_stations
+from enrichment_progress import (
+    DEFAULT_CHECKPOINT_EVERY,
+    GEO_INPUTS,
+    REASON_DONE,
+    REASON_NO_INPUT,
+    REASON_NO_MATCH,
+    ProgressFile,
+    RunCursor,
+    classify_error,
 )
+from geocode import ReverseGeocoder, add_geocode_arguments, station_coordinates
+from region_boundaries import DEFAULT_BORDER_MARGIN_KM, DEFAULT_BOUNDARIES_PATH, RegionIndex
+from station_schema import REGIONS
+from station_store import DATA_PATH, add_store_arguments, open_store
+from work_queue import add_order_argument, prioritize, resolve_order
+
+DEFAULT_PROGRESS_PATH = Path("tools/state-region-progress.json")
 
 REGION_ALIASES = {
     "Attica": ["attica", "attiki"],
     "Central Macedonia": ["central macedonia"],
-    "West Macedonia": ["west macedonia", "western macedonia"],
-    "East Macedonia and Thrace": ["east macedonia and thrace", "eastern macedonia and thrace"],
+    "Western Macedonia": ["west macedonia", "western macedonia"],
+    "Eastern Macedonia and Thrace": ["east macedonia and thrace", "eastern macedonia and thrace"],
     "Thessaly": ["thessaly", "thessalia"],
     "Epirus": ["epirus", "ipeiros"],
     "Western Greece": ["western greece", "west greece"],
@@ -71,25 +65,6 @@ CITY_SUFFIXES = (
 ADDRESS_FIELDS = ("state", "region", "state_district", "county")
 
 
-def reverse_geocode(lat: float, lon: float, language: str) -> dict:
-    query = urlencode(
-        {
-            "format": "jsonv2",
-            "lat": f"{lat:.6f}",
-            "lon": f"{lon:.6f}",
-            "addressdetails": "1",
-            "accept-language": language,
-        }
-    )
-    url = f"{NOMINATIM_URL}?{query}"
-    req = Request(url, headers={"User-Agent": USER_AGENT})
-    with urlopen(req, timeout=20) as resp:
-        content_type = resp.headers.get("Content-Type", "")
-        if "application/json" not in content_type:
-            raise ValueError(f"Unsupported content-type: {content_type}")
-        return json.loads(resp.read(1024 * 1024).decode("utf-8", errors="ignore"))
-
-
 def normalize_text(value: str) -> str:
     cleaned = value.strip().lower()
     cleaned = re.sub(r"[\s\-_/]+", " ", cleaned)
@@ -121,19 +96,84 @@ def clean_city(value: str) -> str:
     return cleaned
 
 
+def match_region(value: str) -> str | None:
+    normalized = normalize_text(value)
+    for region, aliases in REGION_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                return region
+    return None
+
+
 def map_region(address: dict) -> str | None:
     for field in ADDRESS_FIELDS:
         value = address.get(field)
         if not isinstance(value, str) or not value.strip():
             continue
-        normalized = normalize_text(value)
-        for region, aliases in REGION_ALIASES.items():
-            for alias in aliases:
-                if alias in normalized:
-                    return region
+        region = match_region(value)
+        if region:
+            return region
     return None
 
 
+def resolve_offline(station, boundaries: RegionIndex | None) -> str | None:
+    coordinates = station_coordinates(station)
+    if boundaries is None or coordinates is None:
+        return None
+    return boundaries.resolve(*coordinates)
+
+
+def process_station(
+    station, store, progress: ProgressFile, geocoder: ReverseGeocoder, boundaries: RegionIndex | None
+) -> bool:
+    station_id = station.get("stationuuid")
+    state_value = station.get("state")
+    state_is_region = isinstance(state_value, str) and state_value in REGIONS
+    city_value = station.get("city")
+
+    lat = station.get("geo_lat")
+    lon = station.get("geo_long")
+    if lat in (None, "") or lon in (None, ""):
+        progress.mark(station, REASON_NO_INPUT)
+        return False
+
+    print(f"Checking: {station.get('name')} ({station_id})")
+    print(f"Geo: {lat}, {lon}")
+
+    region = resolve_offline(station, boundaries)
+    if region:
+        print("Resolved offline from region boundaries.")
+    else:
+        try:
+            address = geocoder.lookup_station(station)
+        except Exception as exc:
+            print(f"Failed to reverse-geocode: {exc}")
+            progress.mark(station, classify_error(exc))
+            return False
+        region = map_region(address)
+
+    if not region:
+        print("No region match found. No changes made.")
+        progress.mark(station, REASON_NO_MATCH)
+        return False
+
+    city_candidate = None
+    if isinstance(city_value, str) and city_value.strip():
+        city_candidate = clean_city(city_value)
+    elif isinstance(state_value, str) and state_value.strip() and not state_is_region:
+        city_candidate = clean_city(state_value)
+
+    updates = {"state": region}
+    if city_candidate:
+        updates["city"] = city_candidate
+
+    store.update(station, **updates)
+    store.checkpoint()
+    progress.mark(station, REASON_DONE)
+    print(f"✓ Updated state to: {region}")
+    return True
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description=(
@@ -144,14 +184,14 @@ def main() -> int:
     parser.add_argument(
         "--sleep",
         type=float,
-        default=1.0,
-        help="Seconds to sleep between requests (default: 1.0 for Nominatim)",
+        default=None,
+        help="Seconds between Nominatim requests; same as --rate 1/SLEEP",
     )
     parser.add_argument(
         "--progress-file",
         type=Path,
         default=DEFAULT_PROGRESS_PATH,
-        help="Path to progress file for skipped stations",
+        help="Path to progress file for processed stations",
     )
     parser.add_argument(
         "--lang",
@@ -159,86 +199,82 @@ def main() -> int:
         default="en",
         help="Reverse-geocode language (default: en)",
     )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help=f"Save the resume cursor every N stations (default: {DEFAULT_CHECKPOINT_EVERY})",
+    )
+    parser.add_argument(
+        "--boundaries",
+        type=Path,
+        default=DEFAULT_BOUNDARIES_PATH,
+        help=(
+            "GeoJSON region polygons tried before Nominatim "
+            f"(default: {DEFAULT_BOUNDARIES_PATH}, core areas around the main cities; skipped if missing)"
+        ),
+    )
+    parser.add_argument(
+        "--border-margin-km",
+        type=float,
+        default=DEFAULT_BORDER_MARGIN_KM,
+        help=f"Points closer than this to a region border go to Nominatim (default: {DEFAULT_BORDER_MARGIN_KM})",
+    )
+    add_coordinate_arguments(parser)
+    add_order_argument(parser)
+    add_geocode_arguments(parser)
+    add_store_arguments(parser)
     args = parser.parse_args()
 
     if not DATA_PATH.exists():
         print(f"Data file not found: {DATA_PATH}")
         return 1
 
-    data = json.loads(DATA_PATH.read_text(encoding="utf-8"))
+    store = open_store(DATA_PATH, args)
     processed = 0
     max_items = args.max if args.max and args.max > 0 else float("inf")
 
-    skipped = set()
-    if args.progress_file.exists():
-        try:
-            skipped = set(json.loads(args.progress_file.read_text(encoding="utf-8")))
-        except Exception:
-            skipped = set()
+    progress = ProgressFile.load(args.progress_file, GEO_INPUTS)
+    progress.on_mark = store.record_status
+    boundaries = None
+    if args.boundaries.exists():
+        boundaries = RegionIndex.load(args.boundaries, match_region, args.border_margin_km)
+        print(f"Loaded {len(boundaries)} region polygons from {args.boundaries}")
+    else:
+        print(f"No region boundaries at {args.boundaries}; every lookup goes to Nominatim.")
+    order = resolve_order(args)
+    geocoder = ReverseGeocoder.from_args(args)
+    # One pass screens coordinates and clusters what the boundaries cannot settle, since only that reaches Nominatim.
+    screened = screen_stations(
+        (station for station in store if not progress.is_done(station)), store, progress, args.bbox, args.fix_swapped
+    )
+    geocoder.cluster((station for station in screened if not resolve_offline(station, boundaries)), args.cluster_precision)
+    cursor = RunCursor.for_progress(args.progress_file, args.checkpoint_every)
+    finished = False
 
     try:
-        for station in data:
+        for index, station in cursor.resume(prioritize(store, order)):
             if processed >= max_items:
                 break
-            station_id = station.get("stationuuid")
-            if station_id in skipped:
-                continue
-
-            state_value = station.get("state")
-            state_is_region = isinstance(state_value, str) and state_value in REGIONS
-            city_value = station.get("city")
-
-            lat = station.get("geo_lat")
-            lon = station.get("geo_long")
-            if lat in (None, "") or lon in (None, ""):
-                skipped.add(station_id)
-                continue
-
-            print(f"Checking: {station.get('name')} ({station_id})")
-            print(f"Geo: {lat}, {lon}")
-
-            try:
-                payload = reverse_geocode(float(lat), float(lon), args.lang)
-            except Exception as exc:
-                print(f"Failed to reverse-geocode: {exc}")
-                skipped.add(station_id)
-                continue
-
-            address = payload.get("address") or {}
-            region = map_region(address)
-            if not region:
-                print("No region match found. No changes made.")
-                skipped.add(station_id)
-                continue
-
-            city_candidate = None
-            if isinstance(city_value, str) and city_value.strip():
-                city_candidate = clean_city(city_value)
-            elif isinstance(state_value, str) and state_value.strip() and not state_is_region:
-                city_candidate = clean_city(state_value)
-
-            if city_candidate:
-                station["city"] = city_candidate
-
-            station["state"] = region
-            DATA_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-            print(f"✓ Updated state to: {region}")
-            processed += 1
-
-            if args.sleep > 0 and processed < max_items:
-                time.sleep(args.sleep)
+            if not progress.is_done(station) and process_station(station, store, progress, geocoder, boundaries):
+                processed += 1
+            # Results and progress are flushed before the cursor moves past the station.
+            progress.save()
+            cursor.advance(index, station)
+        else:
+            finished = True
     except KeyboardInterrupt:
         print("Interrupted. Progress saved.")
-        args.progress_file.write_text(
-            json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n",
-            encoding="utf-8",
-        )
         return 130
+    finally:
+        store.compact()
+        progress.compact()
+        geocoder.close()
+        if finished:
+            cursor.clear()
+        else:
+            cursor.save()
 
-    args.progress_file.write_text(
-        json.dumps(sorted(skipped), ensure_ascii=False, indent=2) + "\n",
-        encoding="utf-8",
-    )
     return 0
 
 
@@ -0,0 +1,103 @@
+import json
+import math
+from pathlib import Path
+
+DEFAULT_GAZETTEER_PATH = Path("tools/gazetteer.json")
+DEFAULT_CITY_RADIUS_KM = 1.5
+# The nearest city must be at most this fraction of the distance to the second nearest, so suburbs between two
+# cities (Athens/Piraeus) are left to Nominatim instead of being guessed.
+DEFAULT_CITY_RATIO = 0.5
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class KDTree:
+    # 2-d tree over points projected to a local equirectangular plane (km), which is accurate enough at Greek scale.
+    def __init__(self, points: list[tuple[float, float]]):
+        self.reference_lat = sum(lat for lat, _ in points) / len(points) if points else 0.0
+        self._scale = math.cos(math.radians(self.reference_lat))
+        self._points = [self.project(lat, lon) for lat, lon in points]
+        self._root = self._build(list(range(len(points))), 0)
+
+    def project(self, lat: float, lon: float) -> tuple[float, float]:
+        return math.radians(lon) * self._scale * EARTH_RADIUS_KM, math.radians(lat) * EARTH_RADIUS_KM
+
+    def _build(self, indexes: list[int], axis: int):
+        if not indexes:
+            return None
+        indexes.sort(key=lambda index: self._points[index][axis])
+        middle = len(indexes) // 2
+        return (
+            indexes[middle],
+            axis,
+            self._build(indexes[:middle], 1 - axis),
+            self._build(indexes[middle + 1 :], 1 - axis),
+        )
+
+    def nearest(self, lat: float, lon: float, count: int = 1) -> list[tuple[int, float]]:
+        # Returns up to `count` (point index, planar distance in km) pairs, closest first.
+        target = self.project(lat, lon)
+        best: list[tuple[float, int]] = []
+
+        def visit(node) -> None:
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self._points[index]
+            distance = math.hypot(point[0] - target[0], point[1] - target[1])
+            if len(best) < count or distance < best[-1][0]:
+                best.append((distance, index))
+                best.sort()
+                del best[count:]
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            visit(near)
+            if len(best) < count or abs(delta) < best[-1][0]:
+                visit(far)
+
+        visit(self._root)
+        return [(index, distance) for distance, index in best]
+
+
+class Gazetteer:
+    def __init__(self, entries: list[dict]):
+        self.entries = entries
+        self._tree = KDTree([(entry["lat"], entry["lon"]) for entry in entries])
+
+    @classmethod
+    def load(cls, path: Path) -> "Gazetteer":
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        entries = [
+            entry
+            for entry in payload
+            if isinstance(entry, dict)
+            and isinstance(entry.get("name"), str)
+            and isinstance(entry.get("lat"), (int, float))
+            and isinstance(entry.get("lon"), (int, float))
+        ]
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def nearest(
+        self, lat: float, lon: float, max_km: float = DEFAULT_CITY_RADIUS_KM, ratio: float = DEFAULT_CITY_RATIO
+    ) -> dict | None:
+        found = self._tree.nearest(lat, lon, 2)
+        if not found:
+            return None
+        entry = self.entries[found[0][0]]
+        distance = haversine_km(lat, lon, entry["lat"], entry["lon"])
+        if distance > max_km:
+            return None
+        if len(found) > 1:
+            runner_up = self.entries[found[1][0]]
+            if distance > ratio * haversine_km(lat, lon, runner_up["lat"], runner_up["lon"]):
+                return None
+        return entry
@@ -0,0 +1,255 @@
+import json
+import math
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urlparse
+
+import http_client
+from rate_limit import TokenBucket, retry_after_seconds
+
+USER_AGENT = "Mozilla/5.0 (compatible; E-RadioBot/1.0; +https://e-radio.github.io)"
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+PUBLIC_NOMINATIM_HOST = "nominatim.openstreetmap.org"
+PUBLIC_MAX_RATE = 1.0
+SELF_HOSTED_RATE = 10.0
+MAX_RETRIES = 3
+DEFAULT_CACHE_PATH = Path("tools/geocode-cache.jsonl")
+DEFAULT_PRECISION = 4
+DEFAULT_CLUSTER_PRECISION = 2
+
+
+def reverse_geocode(lat: float, lon: float, language: str, url: str = NOMINATIM_URL) -> dict:
+    query = urlencode(
+        {
+            "format": "jsonv2",
+            "lat": f"{lat:.6f}",
+            "lon": f"{lon:.6f}",
+            "addressdetails": "1",
+            "accept-language": language,
+        }
+    )
+    resp = http_client.get(f"{url}?{query}", {"User-Agent": USER_AGENT})
+    content_type = resp.headers.get("Content-Type", "")
+    if "application/json" not in content_type:
+        raise ValueError(f"Unsupported content-type: {content_type}")
+    return json.loads(resp.body.decode("utf-8", errors="ignore"))
+
+
+def is_public_nominatim(url: str) -> bool:
+    return urlparse(url).hostname == PUBLIC_NOMINATIM_HOST
+
+
+def add_geocode_arguments(parser) -> None:
+    parser.add_argument(
+        "--nominatim-url",
+        default=NOMINATIM_URL,
+        help=f"Reverse endpoint; point it at a self-hosted Nominatim to allow a higher --rate (default: {NOMINATIM_URL})",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help=(
+            f"Nominatim requests per second (default: {PUBLIC_MAX_RATE:g} for the public server, capped there; "
+            f"{SELF_HOSTED_RATE:g} for other URLs; 0 = unlimited on self-hosted)"
+        ),
+    )
+    parser.add_argument(
+        "--geocode-cache",
+        type=Path,
+        default=DEFAULT_CACHE_PATH,
+        help=f"Reverse-geocode cache shared by the geo tools (default: {DEFAULT_CACHE_PATH})",
+    )
+    parser.add_argument("--no-geocode-cache", action="store_true", help="Always query Nominatim")
+    parser.add_argument(
+        "--geocode-precision",
+        type=int,
+        default=DEFAULT_PRECISION,
+        help=f"Decimals coordinates are rounded to for the cache (default: {DEFAULT_PRECISION}, about 11 m)",
+    )
+    parser.add_argument(
+        "--cluster-precision",
+        type=int,
+        default=DEFAULT_CLUSTER_PRECISION,
+        help=(
+            "Group pending stations into lat/lon grid cells of this many decimals and geocode one point per cell "
+            f"(default: {DEFAULT_CLUSTER_PRECISION}, about 1 km; -1 disables clustering)"
+        ),
+    )
+
+
+def station_coordinates(station) -> tuple[float, float] | None:
+    try:
+        return float(station.get("geo_lat")), float(station.get("geo_long"))
+    except (TypeError, ValueError):
+        return None
+
+
+def grid_cell(lat: float, lon: float, precision: int) -> tuple[int, int]:
+    scale = 10**precision
+    return math.floor(lat * scale), math.floor(lon * scale)
+
+
+def cluster_stations(stations, precision: int) -> dict[tuple[int, int], list]:
+    # Keeps (stationuuid, coordinates) rather than the records, so streamed stations are not all held at once.
+    # Always drains `stations`, even when clustering is disabled: callers chain their screening pass into it.
+    cells: dict[tuple[int, int], list] = {}
+    for station in stations:
+        coordinates = station_coordinates(station)
+        if coordinates is not None and precision >= 0:
+            cells.setdefault(grid_cell(*coordinates, precision), []).append((station.get("stationuuid"), coordinates))
+    return cells
+
+
+def cell_representative(members: list) -> tuple[float, float]:
+    # A real member nearest the cell's mean, so the queried point is never an empty grid corner or open sea.
+    lat = sum(coordinates[0] for _, coordinates in members) / len(members)
+    lon = sum(coordinates[1] for _, coordinates in members) / len(members)
+    return min((coordinates for _, coordinates in members), key=lambda point: (point[0] - lat) ** 2 + (point[1] - lon) ** 2)
+
+
+class GeocodeCache:
+    # Append-only JSONL of {"key", "address"}; the last line for a key wins, a torn last line is ignored.
+    def __init__(self, path: Path, precision: int = DEFAULT_PRECISION):
+        self.path = path
+        self.precision = precision
+        self.entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._handle = None
+
+    @classmethod
+    def load(cls, path: Path, precision: int = DEFAULT_PRECISION) -> "GeocodeCache":
+        cache = cls(path, precision)
+        if path.exists():
+            with path.open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if isinstance(record, dict) and isinstance(record.get("key"), str) and isinstance(record.get("address"), dict):
+                        cache.entries[record["key"]] = record["address"]
+        return cache
+
+    def quantize(self, lat: float, lon: float) -> tuple[float, float]:
+        return round(lat, self.precision), round(lon, self.precision)
+
+    def key(self, lat: float, lon: float, language: str) -> str:
+        lat, lon = self.quantize(lat, lon)
+        return f"{lat:.{self.precision}f},{lon:.{self.precision}f},{language}"
+
+    def get(self, lat: float, lon: float, language: str) -> dict | None:
+        address = self.entries.get(self.key(lat, lon, language))
+        if address is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return address
+
+    def put(self, lat: float, lon: float, language: str, address: dict) -> None:
+        key = self.key(lat, lon, language)
+        self.entries[key] = address
+        if self._handle is None:
+            self._handle = self.path.open("a", encoding="utf-8")
+        self._handle.write(json.dumps({"key": key, "address": address}, ensure_ascii=False) + "\n")
+        self._handle.flush()
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = f" ({self.hits / lookups:.0%} hit rate)" if lookups else ""
+        return f"Geocode cache: {self.hits} hits, {self.misses} misses{rate}, {len(self.entries)} entries"
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def request_rate(url: str, rate: float | None = None, sleep: float | None = None) -> float:
+    if rate is None and sleep is not None:
+        rate = 1 / sleep if sleep > 0 else 0.0
+    if rate is None:
+        rate = PUBLIC_MAX_RATE if is_public_nominatim(url) else SELF_HOSTED_RATE
+    if is_public_nominatim(url) and (rate <= 0 or rate > PUBLIC_MAX_RATE):
+        # The public usage policy allows one request per second at most.
+        print(f"Capping the public Nominatim rate at {PUBLIC_MAX_RATE:g} request/s")
+        rate = PUBLIC_MAX_RATE
+    return rate
+
+
+class ReverseGeocoder:
+    def __init__(
+        self, language: str, cache: GeocodeCache | None = None, limiter: TokenBucket | None = None, url: str = NOMINATIM_URL
+    ):
+        self.language = language
+        self.cache = cache
+        self.url = url
+        # Shared by every request of the run; cache hits never take a token.
+        self.limiter = limiter or TokenBucket(request_rate(url))
+        self.requests = 0
+        self.throttled = 0
+        # stationuuid -> the coordinates queried on behalf of its whole grid cell.
+        self._representatives: dict[str, tuple[float, float]] = {}
+        self._fanout: dict[tuple[float, float], dict] = {}
+
+    @classmethod
+    def from_args(cls, args) -> "ReverseGeocoder":
+        cache = None if args.no_geocode_cache else GeocodeCache.load(args.geocode_cache, args.geocode_precision)
+        limiter = TokenBucket(request_rate(args.nominatim_url, args.rate, getattr(args, "sleep", None)))
+        return cls(args.lang, cache, limiter, args.nominatim_url)
+
+    def _request(self, lat: float, lon: float) -> dict:
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            self.requests += 1
+            try:
+                return reverse_geocode(lat, lon, self.language, self.url).get("address") or {}
+            except HTTPError as exc:
+                if exc.code not in (429, 503) or attempt >= MAX_RETRIES:
+                    raise
+                delay = retry_after_seconds(exc.headers.get("Retry-After") if exc.headers else None)
+                print(f"Nominatim answered {exc.code}; waiting {delay:g}s before retrying")
+                self.limiter.pause(delay)
+                self.throttled += 1
+                attempt += 1
+
+    def lookup(self, lat: float, lon: float) -> dict:
+        if self.cache is None:
+            return self._request(lat, lon)
+        address = self.cache.get(lat, lon, self.language)
+        if address is not None:
+            return address
+        # Query the quantized point so every coordinate sharing the key gets the same answer.
+        lat, lon = self.cache.quantize(lat, lon)
+        address = self._request(lat, lon)
+        self.cache.put(lat, lon, self.language, address)
+        return address
+
+    def cluster(self, stations, precision: int) -> None:
+        cells = cluster_stations(stations, precision)
+        members = 0
+        for cell_members in cells.values():
+            representative = cell_representative(cell_members)
+            for station_id, _ in cell_members:
+                self._representatives[station_id] = representative
+            members += len(cell_members)
+        if members:
+            print(f"Clustered {members} stations into {len(cells)} cells at precision {precision}")
+
+    def lookup_station(self, station) -> dict:
+        representative = self._representatives.get(station.get("stationuuid"))
+        if representative is None:
+            return self.lookup(float(station.get("geo_lat")), float(station.get("geo_long")))
+        address = self._fanout.get(representative)
+        if address is None:
+            address = self._fanout[representative] = self.lookup(*representative)
+        return address
+
+    def close(self) -> None:
+        if self.throttled:
+            print(f"Nominatim throttled {self.throttled} request(s)")
+        if self.cache is not None:
+            print(self.cache.summary())
+            self.cache.close()
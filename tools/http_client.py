@@ -0,0 +1,150 @@
+import base64
+import http.client
+import ssl
+import zlib
+from urllib.error import HTTPError, URLError
+from urllib.parse import unquote, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+DEFAULT_TIMEOUT = 20
+DEFAULT_MAX_BYTES = 1024 * 1024
+MAX_PER_HOST = 2
+MAX_REDIRECTS = 5
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+# Errors that mean an idle keep-alive connection was closed by the server; retried once on a fresh one.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, BrokenPipeError, ConnectionResetError)
+
+
+class Response:
+    def __init__(self, url: str, status: int, headers, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def text(self, default_charset: str = "utf-8") -> str:
+        return self.body.decode(self.headers.get_content_charset() or default_charset, errors="ignore")
+
+
+def proxy_for(scheme: str, host: str) -> tuple[str, int, dict] | None:
+    # Honours HTTP(S)_PROXY / NO_PROXY like urlopen: (proxy host, proxy port, extra headers) or None for direct.
+    proxy = getproxies().get(scheme)
+    if not proxy or proxy_bypass(host):
+        return None
+    parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    if not parts.hostname:
+        return None
+    headers = {}
+    if parts.username:
+        credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode("utf-8")
+        headers["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials).decode("ascii")
+    return parts.hostname, parts.port or 8080, headers
+
+
+def _decode(body: bytes, encoding: str | None, max_bytes: int) -> bytes:
+    if not encoding or encoding == "identity":
+        return body
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        wbits = 16 + zlib.MAX_WBITS if encoding != "deflate" else zlib.MAX_WBITS
+        return zlib.decompressobj(wbits).decompress(body, max_bytes)
+    raise ValueError(f"Unsupported content-encoding: {encoding}")
+
+
+class HttpPool:
+    # Keeps up to MAX_PER_HOST idle keep-alive connections per (scheme, host, port), sharing one TLS context.
+    def __init__(self, max_per_host: int = MAX_PER_HOST, timeout: float = DEFAULT_TIMEOUT):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.context = ssl.create_default_context()
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self.opened = 0
+        self.reused = 0
+
+    def _connection(self, key: tuple[str, str, int], proxy) -> tuple[http.client.HTTPConnection, bool]:
+        idle = self._idle.get(key)
+        if idle:
+            self.reused += 1
+            return idle.pop(), True
+        scheme, host, port = key
+        self.opened += 1
+        if proxy is None:
+            if scheme == "https":
+                return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self.context), False
+            return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+        proxy_host, proxy_port, proxy_headers = proxy
+        if scheme == "https":
+            # CONNECT tunnel through the proxy; TLS is still verified against the target host.
+            connection = http.client.HTTPSConnection(proxy_host, proxy_port, timeout=self.timeout, context=self.context)
+            connection.set_tunnel(host, port, headers=proxy_headers)
+            return connection, False
+        # Plain HTTP goes to the proxy with an absolute request target (see _send).
+        return http.client.HTTPConnection(proxy_host, proxy_port, timeout=self.timeout), False
+
+    def _release(self, key: tuple[str, str, int], connection: http.client.HTTPConnection) -> None:
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.max_per_host:
+            idle.append(connection)
+        else:
+            connection.close()
+
+    def _send(self, url: str, headers: dict, max_bytes: int) -> Response:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise URLError(f"unsupported URL: {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        request_headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive", **headers}
+        proxy = proxy_for(parts.scheme, parts.hostname)
+        if proxy is not None and parts.scheme == "http":
+            target = f"http://{parts.netloc.rpartition('@')[2]}{target}"
+            request_headers.update(proxy[2])
+
+        while True:
+            connection, reused = self._connection(key, proxy)
+            try:
+                connection.request("GET", target, headers=request_headers)
+                resp = connection.getresponse()
+                raw = resp.read(max_bytes + 1)
+            except STALE_CONNECTION_ERRORS:
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            break
+
+        # Only a fully drained response leaves the connection reusable.
+        if len(raw) <= max_bytes and resp.isclosed() and not resp.will_close:
+            self._release(key, connection)
+        else:
+            connection.close()
+        body = _decode(raw[:max_bytes], resp.headers.get("Content-Encoding"), max_bytes)
+        return Response(url, resp.status, resp.headers, body)
+
+    def get(self, url: str, headers: dict | None = None, max_bytes: int = DEFAULT_MAX_BYTES) -> Response:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(url, headers or {}, max_bytes)
+            if response.status in REDIRECT_CODES and response.headers.get("Location"):
+                url = urljoin(url, response.headers["Location"])
+                continue
+            if response.status >= 400:
+                raise HTTPError(url, response.status, http.client.responses.get(response.status, ""), response.headers, None)
+            return response
+        raise URLError(f"too many redirects: {url}")
+
+    def close(self) -> None:
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
+
+
+_pool = HttpPool()
+
+
+def get(url: str, headers: dict | None = None, max_bytes: int = DEFAULT_MAX_BYTES) -> Response:
+    return _pool.get(url, headers, max_bytes)
@@ -0,0 +1,54 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+
+def cache_path_for(path: Path) -> Path:
+    return path.with_name(f".{path.name}.cache")
+
+
+def content_hash(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+def _header(path: Path, version: int, digest: str | None = None) -> dict:
+    stat = path.stat()
+    return {
+        "version": version,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": digest or content_hash(path),
+    }
+
+
+def read_cache(path: Path, version: int):
+    cache_path = cache_path_for(path)
+    if not cache_path.exists() or not path.exists():
+        return None
+    try:
+        with cache_path.open("rb") as handle:
+            header = pickle.load(handle)
+            if not isinstance(header, dict) or header.get("version") != version:
+                return None
+            stat = path.stat()
+            if (header.get("size"), header.get("mtime_ns")) != (stat.st_size, stat.st_mtime_ns):
+                # Size/mtime moved (checkout, touch, copy): fall back to comparing content.
+                if header.get("size") != stat.st_size or header.get("hash") != content_hash(path):
+                    return None
+            return pickle.load(handle)
+    except Exception:
+        return None
+
+
+def write_cache(path: Path, payload, version: int) -> None:
+    cache_path = cache_path_for(path)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+    try:
+        with tmp_path.open("wb") as handle:
+            pickle.dump(_header(path, version), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:
+        tmp_path.unlink(missing_ok=True)
+        print(f"Could not write parse cache {cache_path}: {exc}")
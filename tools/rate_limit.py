@@ -0,0 +1,52 @@
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+DEFAULT_RETRY_AFTER = 60.0
+
+
+class TokenBucket:
+    # Schedules request starts at `rate` per second; time spent parsing and writing between calls counts as waiting.
+    def __init__(self, rate: float, burst: float = 1.0, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            now = self._clock()
+            if now < self._blocked_until:
+                self._sleep(self._blocked_until - now)
+                continue
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            self._sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        # Server asked us to back off: hold every caller until then and drop any saved-up burst.
+        self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+        self.tokens = 0.0
+
+
+def retry_after_seconds(value: str | None, default: float = DEFAULT_RETRY_AFTER) -> float:
+    if not value:
+        return default
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
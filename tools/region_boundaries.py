@@ -0,0 +1,111 @@
+import json
+import math
+from pathlib import Path
+
+DEFAULT_BOUNDARIES_PATH = Path("tools/greece-regions.geojson")
+DEFAULT_BORDER_MARGIN_KM = 1.0
+GRID_SIZE = 0.25
+KM_PER_DEGREE = 111.32
+NAME_PROPERTIES = ("name:en", "name_en", "NAME_EN", "NAME_1", "region", "name")
+
+
+def _rings(geometry: dict) -> list[list[list[tuple[float, float]]]]:
+    # Returns polygons as [outer, *holes] lists of (lon, lat) rings.
+    kind = geometry.get("type")
+    coordinates = geometry.get("coordinates") or []
+    if kind == "Polygon":
+        polygons = [coordinates]
+    elif kind == "MultiPolygon":
+        polygons = coordinates
+    else:
+        return []
+    return [[[(float(x), float(y)) for x, y, *_ in ring] for ring in polygon if ring] for polygon in polygons if polygon]
+
+
+def _segment_distance(px: float, py: float, ax: float, ay: float, bx: float, by: float) -> float:
+    dx = bx - ax
+    dy = by - ay
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length))
+    ex = ax + t * dx - px
+    ey = ay + t * dy - py
+    return math.sqrt(ex * ex + ey * ey)
+
+
+def _locate(px: float, py: float, rings, x_scale: float) -> tuple[bool, float]:
+    # One pass over the edges: even-odd containment plus distance to the nearest edge (lon scaled to km-ish units).
+    inside = False
+    nearest = math.inf
+    for ring in rings:
+        ax, ay = ring[-1]
+        for bx, by in ring:
+            if (ay > py) != (by > py) and px < (bx - ax) * (py - ay) / (by - ay) + ax:
+                inside = not inside
+            nearest = min(nearest, _segment_distance(px * x_scale, py, ax * x_scale, ay, bx * x_scale, by))
+            ax, ay = bx, by
+    return inside, nearest
+
+
+class RegionIndex:
+    def __init__(self, border_margin_km: float = DEFAULT_BORDER_MARGIN_KM):
+        self.margin = border_margin_km / KM_PER_DEGREE
+        # (region, rings, (min_lon, min_lat, max_lon, max_lat)) per polygon; holes are just extra rings.
+        self.polygons: list[tuple[str, list, tuple[float, float, float, float]]] = []
+        self.grid: dict[tuple[int, int], list[int]] = {}
+
+    @classmethod
+    def load(cls, path: Path, match_region, border_margin_km: float = DEFAULT_BORDER_MARGIN_KM) -> "RegionIndex":
+        index = cls(border_margin_km)
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        features = payload.get("features", []) if payload.get("type") == "FeatureCollection" else [payload]
+        for feature in features:
+            properties = feature.get("properties") or {}
+            region = None
+            for key in NAME_PROPERTIES:
+                value = properties.get(key)
+                if isinstance(value, str) and value.strip():
+                    region = match_region(value)
+                    if region:
+                        break
+            if not region:
+                continue
+            for rings in _rings(feature.get("geometry") or {}):
+                index.add(region, rings)
+        return index
+
+    def add(self, region: str, rings) -> None:
+        xs = [x for ring in rings for x, _ in ring]
+        ys = [y for ring in rings for _, y in ring]
+        bbox = (min(xs), min(ys), max(xs), max(ys))
+        position = len(self.polygons)
+        self.polygons.append((region, rings, bbox))
+        # Cells cover the bbox grown by the margin so neighbours near a border are found from either side.
+        margin = self.margin * 2
+        for cx in range(math.floor((bbox[0] - margin) / GRID_SIZE), math.floor((bbox[2] + margin) / GRID_SIZE) + 1):
+            for cy in range(math.floor((bbox[1] - margin) / GRID_SIZE), math.floor((bbox[3] + margin) / GRID_SIZE) + 1):
+                self.grid.setdefault((cx, cy), []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.polygons)
+
+    def resolve(self, lat: float, lon: float) -> str | None:
+        # None means "ask Nominatim": outside every polygon, or within the margin of another region's polygon.
+        x_scale = math.cos(math.radians(lat))
+        margin = self.margin * 2
+        found = None
+        neighbours: set[str] = set()
+        for position in self.grid.get((math.floor(lon / GRID_SIZE), math.floor(lat / GRID_SIZE)), ()):
+            region, rings, (min_x, min_y, max_x, max_y) = self.polygons[position]
+            if not (min_x - margin <= lon <= max_x + margin and min_y - margin <= lat <= max_y + margin):
+                continue
+            inside, nearest = _locate(lon, lat, rings, x_scale)
+            if inside and found is None:
+                found = region
+            elif nearest < self.margin:
+                neighbours.add(region)
+        if found is None:
+            return None
+        # Coastlines are edges too; only a different region close by makes the point ambiguous.
+        if neighbours - {found}:
+            return None
+        return found
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
-import json
 import re
 from pathlib import Path
 
-DATA_PATH = Path("src/data/stations-gr.json")
+from station_store import DATA_PATH, StationStore
+
 ICONS_DIR = Path("public/station-icons")
 
 slug_suffix_re = re.compile(r"-[a-z0-9]{6,8}$", re.IGNORECASE)
@@ -24,15 +24,8 @@ def main() -> None:
     if not DATA_PATH.exists():
         raise SystemExit(f"Missing data file: {DATA_PATH}")
 
-    data = json.loads(DATA_PATH.read_text(encoding="utf-8"))
-    by_url: dict[str, list[dict]] = {}
-
-    for station in data:
-        url = (station.get("stream_url") or "").strip()
-        if not url:
-            by_url.setdefault("__no_stream__", []).append(station)
-            continue
-        by_url.setdefault(url, []).append(station)
+    store = StationStore.load(DATA_PATH)
+    by_url = store.stream_groups()
 
     removed: list[dict] = []
     kept_ids: set[str] = set()
@@ -50,9 +43,9 @@ def main() -> None:
         kept_ids.add(keeper.get("stationuuid"))
         removed.extend(stations_sorted[1:])
 
-    final_data = [s for s in data if s.get("stationuuid") in kept_ids]
+    final_data = [s for s in store if s.get("stationuuid") in kept_ids]
 
-    DATA_PATH.write_text(json.dumps(final_data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    StationStore(final_data, DATA_PATH).save()
 
     referenced = set()
     for s in final_data:
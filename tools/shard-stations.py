@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+from dataset_io import atomic_write_text
+from station_shards import SHARDS_DIR, dump_stations, merge_dataset, read_manifest, split_dataset
+from station_store import DATA_PATH, StationStore
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Split the station dataset into per-country/per-region shards and back.")
+    parser.add_argument("--data", type=Path, default=DATA_PATH, help=f"Station JSON path (default: {DATA_PATH})")
+    parser.add_argument("--root", type=Path, default=SHARDS_DIR, help=f"Shard directory (default: {SHARDS_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("split", help="Write shards and manifest from the station JSON")
+    commands.add_parser("merge", help="Rebuild the station JSON from the shards")
+    commands.add_parser("list", help="List shards and station counts by the --country/--region values that select them")
+    args = parser.parse_args()
+
+    if args.command == "split":
+        if not args.data.exists():
+            print(f"Data file not found: {args.data}")
+            return 1
+        manifest = split_dataset(StationStore.load(args.data).stations, args.root)
+        print(f"Wrote {len(manifest['shards'])} shards ({manifest['total']} stations) to {args.root}")
+    elif args.command == "merge":
+        stations = merge_dataset(args.root)
+        atomic_write_text(args.data, dump_stations(stations), keep_backup=True)
+        print(f"Wrote {len(stations)} stations to {args.data}")
+    else:
+        # The country and region columns are the values --country/--region select on.
+        print(f"{'count':>6}  {'country':<10}  region")
+        for entry in read_manifest(args.root)["shards"].values():
+            print(f"{entry['count']:6d}  {entry['countrycode']:<10}  {entry['region']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
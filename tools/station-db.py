@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+from station_db import DEFAULT_DB_PATH, ExportRefused, StationDB
+from station_store import DATA_PATH
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Mirror stations-gr.json into an indexed SQLite database the enrichment tools can run on (--db), and back."
+    )
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help=f"SQLite database path (default: {DEFAULT_DB_PATH})")
+    parser.add_argument("--data", type=Path, default=DATA_PATH, help=f"Station JSON path (default: {DATA_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("import", help="Load the station JSON into the database (replaces existing rows)")
+    export = commands.add_parser("export", help="Write the database back to the station JSON")
+    export.add_argument("--force", action="store_true", help="Export even if the station JSON changed since the import")
+    query = commands.add_parser("query", help="List stations matching an SQL WHERE clause")
+    query.add_argument("where", help="SQL condition, e.g. \"state IS NULL AND homepage IS NOT NULL\"")
+    query.add_argument("--count", action="store_true", help="Only print the number of matches")
+    args = parser.parse_args()
+
+    with StationDB(args.db) as db:
+        if args.command == "import":
+            if not args.data.exists():
+                print(f"Data file not found: {args.data}")
+                return 1
+            print(f"Imported {db.import_json(args.data)} stations into {args.db}")
+        elif args.command == "export":
+            try:
+                print(f"Exported {db.export_json(args.data, args.force)} stations to {args.data}")
+            except ExportRefused as exc:
+                print(f"Not exporting: {exc}")
+                return 1
+        elif args.count:
+            print(db.count(args.where))
+        else:
+            for station in db.query(args.where):
+                print(f"{station.get('stationuuid')}  {station.get('name')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
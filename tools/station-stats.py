@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from coordinate_check import GREECE_BBOX
+from station_columns import NUMERIC_COLUMNS, StationColumns
+from station_store import DATA_PATH
+
+HIGH_BITRATE_THRESHOLD = 320
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Print quick numeric stats for the station dataset.")
+    parser.add_argument("--data", type=Path, default=DATA_PATH, help=f"Station JSON path (default: {DATA_PATH})")
+    parser.add_argument("--top", choices=sorted(NUMERIC_COLUMNS), help="Also list the top stations by this field")
+    parser.add_argument("--limit", type=int, default=20, help="Number of stations to list with --top (default: 20)")
+    args = parser.parse_args()
+
+    if not args.data.exists():
+        print(f"Data file not found: {args.data}")
+        return 1
+
+    columns = StationColumns.load(args.data)
+    report = {
+        "stations": len(columns),
+        "high_quality": int(columns.mask(min_bitrate=HIGH_BITRATE_THRESHOLD).sum()),
+        "online": int(columns.mask(online=True).sum()),
+        "with_geo": int(columns.has_geo().sum()),
+        "geo_outside_greece": int((columns.has_geo() & ~columns.in_bbox(*GREECE_BBOX)).sum()),
+        "bitrate": columns.summary("bitrate"),
+        "votes": columns.summary("votes"),
+    }
+    if args.top:
+        report[f"top_{args.top}"] = columns.top(args.top, args.limit)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
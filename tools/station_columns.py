@@ -0,0 +1,131 @@
+from pathlib import Path
+
+import numpy as np
+
+from station_store import DATA_PATH, StationStore
+
+NUMERIC_COLUMNS = {
+    "bitrate": np.int32,
+    "votes": np.int32,
+    "clickcount": np.int64,
+    "lastcheckok": np.int8,
+    "hls": np.int8,
+    "ssl_error": np.int8,
+    "geo_lat": np.float64,
+    "geo_long": np.float64,
+}
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str) and value.strip():
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+class StationColumns:
+    def __init__(self, uuids: np.ndarray, columns: dict[str, np.ndarray], valid: dict[str, np.ndarray]):
+        self.uuids = uuids
+        self.columns = columns
+        self.valid = valid
+        self.index = {station_id: row for row, station_id in enumerate(uuids.tolist())}
+
+    @classmethod
+    def from_stations(cls, stations) -> "StationColumns":
+        stations = list(stations)
+        uuids = np.array([station.get("stationuuid") for station in stations], dtype=object)
+        columns = {}
+        valid = {}
+        for field, dtype in NUMERIC_COLUMNS.items():
+            raw = [_number(station.get(field)) for station in stations]
+            present = np.fromiter((value is not None for value in raw), dtype=bool, count=len(raw))
+            filler = np.nan if np.issubdtype(dtype, np.floating) else 0
+            values = np.fromiter((filler if value is None else value for value in raw), dtype=np.float64, count=len(raw))
+            if np.issubdtype(dtype, np.floating):
+                present &= np.isfinite(values)
+            columns[field] = values.astype(dtype)
+            valid[field] = present
+        return cls(uuids, columns, valid)
+
+    @classmethod
+    def load(cls, path: Path = DATA_PATH) -> "StationColumns":
+        return cls.from_stations(StationStore.load(path, use_cache=True))
+
+    def __len__(self) -> int:
+        return len(self.uuids)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+    def row(self, station_id: str) -> int | None:
+        return self.index.get(station_id)
+
+    def has_geo(self) -> np.ndarray:
+        return self.valid["geo_lat"] & self.valid["geo_long"]
+
+    def in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        lat = self.columns["geo_lat"]
+        lon = self.columns["geo_long"]
+        with np.errstate(invalid="ignore"):
+            return self.has_geo() & (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+
+    def mask(
+        self,
+        min_bitrate: int | None = None,
+        max_bitrate: int | None = None,
+        min_votes: int | None = None,
+        min_clicks: int | None = None,
+        online: bool | None = None,
+        hls: bool | None = None,
+        ssl_error: bool | None = None,
+        has_geo: bool | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+    ) -> np.ndarray:
+        selected = np.ones(len(self), dtype=bool)
+        if min_bitrate is not None:
+            selected &= self.valid["bitrate"] & (self.columns["bitrate"] >= min_bitrate)
+        if max_bitrate is not None:
+            selected &= self.valid["bitrate"] & (self.columns["bitrate"] <= max_bitrate)
+        if min_votes is not None:
+            selected &= self.valid["votes"] & (self.columns["votes"] >= min_votes)
+        if min_clicks is not None:
+            selected &= self.valid["clickcount"] & (self.columns["clickcount"] >= min_clicks)
+        for field, wanted in (("lastcheckok", online), ("hls", hls), ("ssl_error", ssl_error)):
+            if wanted is not None:
+                selected &= self.valid[field] & ((self.columns[field] != 0) == wanted)
+        if has_geo is not None:
+            selected &= self.has_geo() == has_geo
+        if bbox is not None:
+            selected &= self.in_bbox(*bbox)
+        return selected
+
+    def select(self, mask: np.ndarray) -> list[str]:
+        return self.uuids[mask].tolist()
+
+    def top(self, field: str, limit: int | None = None, mask: np.ndarray | None = None) -> list[str]:
+        selected = self.valid[field] if mask is None else mask & self.valid[field]
+        rows = np.flatnonzero(selected)
+        # Stable sort keeps file order between equal values, like Array.prototype.sort in the pages.
+        order = rows[np.argsort(-self.columns[field][rows].astype(np.float64), kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+        return self.uuids[order].tolist()
+
+    def summary(self, field: str, mask: np.ndarray | None = None) -> dict:
+        selected = self.valid[field] if mask is None else mask & self.valid[field]
+        values = self.columns[field][selected]
+        if not len(values):
+            return {"count": 0}
+        return {
+            "count": int(len(values)),
+            "min": values.min().item(),
+            "max": values.max().item(),
+            "mean": float(values.mean()),
+            "median": float(np.median(values)),
+        }
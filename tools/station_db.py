@@ -0,0 +1,315 @@
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from dataset_io import atomic_write_text
+from station_json import dumps_stations
+from station_record import STATION_FIELDS
+from station_store import _JournaledStore
+
+DEFAULT_DB_PATH = Path("tools/stations.sqlite3")
+
+COLUMN_TYPES = {
+    "bitrate": "INTEGER",
+    "clickcount": "INTEGER",
+    "lastcheckok": "INTEGER",
+    "votes": "INTEGER",
+    "hls": "INTEGER",
+    "ssl_error": "INTEGER",
+    "geo_lat": "REAL",
+    "geo_long": "REAL",
+}
+
+JSON_COLUMNS = ("genres",)
+# Columns added after the first release; older databases get them through ALTER TABLE on open.
+LATE_COLUMNS = (("raw_values", "TEXT"), ("enrichment_status", "TEXT"))
+DEFAULT_PAGE_SIZE = 500
+
+
+def _blank(column: str) -> str:
+    return f"coalesce(trim({column}), '')"
+
+
+# SQL twins of station_store.field_missing(); each side has an expression index below.
+MISSING_CONDITIONS = {
+    "state": f"{_blank('state')} = ''",
+    "city": f"{_blank('city')} = ''",
+    "geo": f"({_blank('geo_lat')} = '' OR {_blank('geo_long')} = '')",
+}
+
+INDEXES = {
+    "idx_stations_position": "position",
+    "idx_stations_state": "state",
+    "idx_stations_city": "city",
+    "idx_stations_bitrate": "bitrate",
+    "idx_stations_codec": "codec",
+    "idx_stations_votes": "votes",
+    "idx_stations_geo": "geo_lat, geo_long",
+    "idx_stations_state_blank": _blank("state"),
+    "idx_stations_city_blank": _blank("city"),
+    "idx_stations_geo_lat_blank": _blank("geo_lat"),
+    "idx_stations_geo_long_blank": _blank("geo_long"),
+    "idx_stations_enrichment": "enrichment_status",
+}
+
+
+class ExportRefused(Exception):
+    pass
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+def _matches_column(field: str, value) -> bool:
+    # SQLite's type affinity would turn 38 into 38.0 in a REAL column and "128" into 128 in an INTEGER one.
+    if value is None or field in JSON_COLUMNS:
+        return True
+    kind = COLUMN_TYPES.get(field, "TEXT")
+    if kind == "INTEGER":
+        return type(value) is int
+    if kind == "REAL":
+        return type(value) is float
+    return type(value) is str
+
+
+def _column_value(field: str, value):
+    if field in JSON_COLUMNS:
+        return json.dumps(value, ensure_ascii=False)
+    # Mismatched scalars still go in the column so queries see them; the exact value lives in raw_values.
+    return value if isinstance(value, (str, int, float)) or value is None else None
+
+
+def _schema() -> str:
+    columns = ["position INTEGER NOT NULL"]
+    for field in STATION_FIELDS:
+        if field == "stationuuid":
+            columns.append("stationuuid TEXT PRIMARY KEY")
+        else:
+            columns.append(f"{field} {COLUMN_TYPES.get(field, 'TEXT')}")
+    # Keys missing from a record, keys we do not model and values the column type would alter are kept so the
+    # export stays lossless.
+    columns.append("missing_fields TEXT")
+    columns.append("extra TEXT")
+    columns.extend(f"{name} {kind}" for name, kind in LATE_COLUMNS)
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS stations ({', '.join(columns)})",
+        # Records which JSON the rows came from, so export never writes back an empty or stale mirror.
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    ]
+    return ";\n".join(statements) + ";"
+
+
+def _indexes() -> str:
+    return "\n".join(f"CREATE INDEX IF NOT EXISTS {name} ON stations ({target});" for name, target in INDEXES.items())
+
+
+def _to_row(position: int, station: dict) -> tuple:
+    values = [position]
+    missing = []
+    raw = {}
+    for field in STATION_FIELDS:
+        if field not in station:
+            missing.append(field)
+            values.append(None)
+            continue
+        value = station[field]
+        if not _matches_column(field, value):
+            raw[field] = value
+        values.append(_column_value(field, value))
+    extra = {key: value for key, value in station.items() if key not in STATION_FIELDS}
+    values.append(json.dumps(missing) if missing else None)
+    values.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+    values.append(json.dumps(raw, ensure_ascii=False) if raw else None)
+    return tuple(values)
+
+
+def _from_row(row: sqlite3.Row) -> dict:
+    missing = set(json.loads(row["missing_fields"])) if row["missing_fields"] else set()
+    raw = json.loads(row["raw_values"]) if row["raw_values"] else {}
+    station = {}
+    for field in STATION_FIELDS:
+        if field in missing:
+            continue
+        value = row[field]
+        if field in raw:
+            value = raw[field]
+        elif field in JSON_COLUMNS and value is not None:
+            value = json.loads(value)
+        station[field] = value
+    if row["extra"]:
+        station.update(json.loads(row["extra"]))
+    return station
+
+
+class StationDB:
+    def __init__(self, path: Path = DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_schema())
+        present = {row["name"] for row in self.conn.execute("PRAGMA table_info(stations)")}
+        for name, kind in LATE_COLUMNS:
+            if name not in present:
+                self.conn.execute(f"ALTER TABLE stations ADD COLUMN {name} {kind}")
+        self.conn.executescript(_indexes())
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def import_stations(self, stations: list[dict]) -> int:
+        placeholders = ", ".join("?" for _ in range(len(STATION_FIELDS) + 4))
+        columns = ", ".join(("position",) + STATION_FIELDS + ("missing_fields", "extra", "raw_values"))
+        with self.conn:
+            self.conn.execute("DELETE FROM stations")
+            self.conn.executemany(
+                f"INSERT INTO stations ({columns}) VALUES ({placeholders})",
+                (_to_row(position, station) for position, station in enumerate(stations)),
+            )
+        return len(stations)
+
+    def import_json(self, path: Path) -> int:
+        count = self.import_stations(json.loads(path.read_text(encoding="utf-8")))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (("source", str(path)), ("source_digest", file_digest(path)), ("imported_at", str(int(time.time())))),
+            )
+        return count
+
+    def meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def query(self, where: str = "1", params: tuple = ()) -> list[dict]:
+        rows = self.conn.execute(f"SELECT * FROM stations WHERE {where} ORDER BY position", params)
+        return [_from_row(row) for row in rows]
+
+    def count(self, where: str = "1", params: tuple = ()) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM stations WHERE {where}", params).fetchone()[0]
+
+    def get(self, station_id: str) -> dict | None:
+        row = self.conn.execute("SELECT * FROM stations WHERE stationuuid = ?", (station_id,)).fetchone()
+        return _from_row(row) if row else None
+
+    def update(self, station_id: str, **fields) -> None:
+        unknown = [field for field in fields if field not in STATION_FIELDS]
+        if unknown:
+            raise KeyError(f"Unknown station field(s): {', '.join(unknown)}")
+        with self.conn:
+            row = self.conn.execute(
+                "SELECT missing_fields, raw_values FROM stations WHERE stationuuid = ?", (station_id,)
+            ).fetchone()
+            if row is None:
+                return
+            missing = [field for field in json.loads(row["missing_fields"] or "[]") if field not in fields]
+            raw = json.loads(row["raw_values"] or "{}")
+            for field, value in fields.items():
+                if _matches_column(field, value):
+                    raw.pop(field, None)
+                else:
+                    raw[field] = value
+            assignments = ", ".join(f"{field} = ?" for field in fields)
+            values = [_column_value(field, value) for field, value in fields.items()]
+            self.conn.execute(
+                f"UPDATE stations SET {assignments}, missing_fields = ?, raw_values = ? WHERE stationuuid = ?",
+                (
+                    *values,
+                    json.dumps(missing) if missing else None,
+                    json.dumps(raw, ensure_ascii=False) if raw else None,
+                    station_id,
+                ),
+            )
+
+    def set_enrichment_status(self, station_id: str, status: str | None) -> None:
+        with self.conn:
+            self.conn.execute("UPDATE stations SET enrichment_status = ? WHERE stationuuid = ?", (status, station_id))
+
+    def pages(self, where: str = "1", params: tuple = (), page_size: int = DEFAULT_PAGE_SIZE):
+        # Keyset pagination on position: updates made between pages cannot skip or repeat a station.
+        last = -1
+        while True:
+            rows = self.conn.execute(
+                f"SELECT * FROM stations WHERE position > ? AND ({where}) ORDER BY position LIMIT ?",
+                (last, *params, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _from_row(row)
+            last = rows[-1]["position"]
+
+    def export_stations(self) -> list[dict]:
+        return self.query()
+
+    def check_export(self, path: Path) -> None:
+        if self.meta("imported_at") is None:
+            raise ExportRefused(f"{self.path} has never been imported; run 'import' first")
+        if self.count() == 0:
+            raise ExportRefused(f"{self.path} has no stations; refusing to overwrite {path} with an empty list")
+        if path.exists() and file_digest(path) != self.meta("source_digest"):
+            raise ExportRefused(f"{path} changed since it was imported; re-import it or pass --force")
+
+    def export_json(self, path: Path, force: bool = False) -> int:
+        if not force:
+            self.check_export(path)
+        elif self.count() == 0:
+            raise ExportRefused(f"{self.path} has no stations; refusing to overwrite {path} with an empty list")
+        stations = self.export_stations()
+        atomic_write_text(path, dumps_stations(stations), keep_backup=True)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('source_digest', ?)", (file_digest(path),))
+        return len(stations)
+
+
+class StationDBStore(_JournaledStore):
+    # Lets the enrichment tools run on the SQLite mirror (--db): missing-field scans use the expression indexes,
+    # each update is a single-row UPDATE instead of a rewrite of the JSON, and progress reasons land in the indexed
+    # enrichment_status column. tools/station-db.py export writes the result back to the JSON.
+    def __init__(self, db: StationDB):
+        self.db = db
+        self.path = db.path
+
+    @classmethod
+    def open(cls, path: Path = DEFAULT_DB_PATH) -> "StationDBStore":
+        if not path.exists():
+            raise SystemExit(f"Station database not found: {path}; run tools/station-db.py import first")
+        db = StationDB(path)
+        if db.meta("imported_at") is None:
+            db.close()
+            raise SystemExit(f"{path} has never been imported; run tools/station-db.py import first")
+        return cls(db)
+
+    def __len__(self) -> int:
+        return self.db.count()
+
+    def __iter__(self):
+        return self.db.pages()
+
+    def get(self, station_id: str) -> dict | None:
+        return self.db.get(station_id)
+
+    def missing(self, *fields: str):
+        return self.db.pages(" OR ".join(MISSING_CONDITIONS[field] for field in fields))
+
+    def update(self, station: dict, **fields) -> dict:
+        changed = {key: value for key, value in fields.items() if station.get(key) != value}
+        if not changed:
+            return changed
+        station.update(changed)
+        self.db.update(station.get("stationuuid"), **changed)
+        return changed
+
+    def record_status(self, station_id: str, status: str | None) -> None:
+        self.db.set_enrichment_status(station_id, status)
+
+    def save(self) -> None:
+        self.db.conn.commit()
@@ -0,0 +1,67 @@
+import json
+import subprocess
+from pathlib import Path
+
+from station_record import to_plain
+
+
+def load_version(source: str) -> list[dict]:
+    # "REV:path" reads a committed version through git; anything else is a file path.
+    if ":" in source and not Path(source).exists():
+        payload = subprocess.run(["git", "show", source], capture_output=True, check=True).stdout
+        return json.loads(payload.decode("utf-8"))
+    return json.loads(Path(source).read_text(encoding="utf-8"))
+
+
+def index_by_uuid(stations) -> dict[str, dict]:
+    indexed = {}
+    for station in stations:
+        station_id = station.get("stationuuid")
+        if station_id:
+            indexed[station_id] = to_plain(station)
+    return indexed
+
+
+def diff_stations(old_stations, new_stations, fields: tuple[str, ...] | None = None) -> dict:
+    old = index_by_uuid(old_stations)
+    new = index_by_uuid(new_stations)
+
+    added = [station_id for station_id in new if station_id not in old]
+    removed = [station_id for station_id in old if station_id not in new]
+    changed: dict[str, dict] = {}
+    field_counts: dict[str, int] = {}
+
+    for station_id, after in new.items():
+        before = old.get(station_id)
+        if before is None or before == after:
+            continue
+        keys = fields if fields is not None else tuple(dict.fromkeys([*before, *after]))
+        delta = {}
+        for key in keys:
+            if before.get(key) != after.get(key) or (key in before) != (key in after):
+                delta[key] = {"old": before.get(key), "new": after.get(key)}
+                field_counts[key] = field_counts.get(key, 0) + 1
+        if delta:
+            changed[station_id] = delta
+
+    return {
+        "summary": {
+            "old": len(old),
+            "new": len(new),
+            "added": len(added),
+            "removed": len(removed),
+            "changed": len(changed),
+            "fields": dict(sorted(field_counts.items(), key=lambda item: (-item[1], item[0]))),
+        },
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+    }
+
+
+def touched_ids(diff: dict, fields: tuple[str, ...] | None = None) -> list[str]:
+    touched = list(diff["added"])
+    for station_id, delta in diff["changed"].items():
+        if fields is None or any(field in delta for field in fields):
+            touched.append(station_id)
+    return touched
@@ -0,0 +1,74 @@
+import json
+import math
+
+from station_record import to_plain
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_INT_MIN = -(2**63)
+_INT_MAX = 2**64 - 1
+
+
+def _orjson_matches_stdlib(value) -> bool:
+    # orjson and json.dumps agree byte-for-byte except on exponent-form floats, NaN/inf and >64-bit ints.
+    if value is None or isinstance(value, (str, bool)):
+        return True
+    if isinstance(value, int):
+        return _INT_MIN <= value <= _INT_MAX
+    if isinstance(value, float):
+        return math.isfinite(value) and (value == 0 or 1e-4 <= abs(value) < 1e16)
+    if isinstance(value, list):
+        return all(_orjson_matches_stdlib(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _orjson_matches_stdlib(item) for key, item in value.items())
+    return False
+
+
+def encode_station(station) -> str:
+    plain = to_plain(station)
+    if orjson is not None and _orjson_matches_stdlib(plain):
+        text = orjson.dumps(plain, option=orjson.OPT_INDENT_2).decode("utf-8")
+    else:
+        text = json.dumps(plain, ensure_ascii=False, indent=2)
+    return "  " + text.replace("\n", "\n  ")
+
+
+def join_encoded(encoded) -> str:
+    encoded = list(encoded)
+    if not encoded:
+        return "[]\n"
+    return "[\n" + ",\n".join(encoded) + "\n]\n"
+
+
+def dumps_stations(stations) -> str:
+    return join_encoded(encode_station(station) for station in stations)
+
+
+class EncodedCache:
+    # Keyed by object identity: records must be changed through StationStore.update() so the entry is dropped.
+    def __init__(self):
+        self._encoded: dict[int, str] = {}
+
+    def invalidate(self, station) -> None:
+        self._encoded.pop(id(station), None)
+
+    def clear(self) -> None:
+        self._encoded.clear()
+
+    def dumps(self, stations) -> str:
+        encoded = self._encoded
+        live = {}
+        texts = []
+        for station in stations:
+            key = id(station)
+            text = encoded.get(key)
+            if text is None:
+                text = encode_station(station)
+            live[key] = text
+            texts.append(text)
+        # Only keep entries for records still in the list so a recycled id() can never hit a stale entry.
+        self._encoded = live
+        return join_encoded(texts)
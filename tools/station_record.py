@@ -0,0 +1,135 @@
+import sys
+
+STATION_FIELDS = (
+    "slug",
+    "stationuuid",
+    "name",
+    "state",
+    "country",
+    "city",
+    "countrycode",
+    "stream_url",
+    "homepage",
+    "favicon",
+    "genres",
+    "language",
+    "bitrate",
+    "codec",
+    "clickcount",
+    "lastcheckok",
+    "votes",
+    "hls",
+    "ssl_error",
+    "geo_lat",
+    "geo_long",
+)
+
+INTERNED_FIELDS = frozenset(("state", "country", "city", "countrycode", "language", "codec"))
+
+_FIELD_SET = frozenset(STATION_FIELDS)
+
+
+def _intern(field: str, value):
+    if field in INTERNED_FIELDS and isinstance(value, str):
+        return sys.intern(value)
+    if field == "genres" and isinstance(value, list):
+        return [sys.intern(item) if isinstance(item, str) else item for item in value]
+    return value
+
+
+class Station:
+    # Unset slots stand for keys absent from the source record.
+    __slots__ = STATION_FIELDS + ("_extra",)
+
+    def __init__(self, fields: dict | None = None, **kwargs):
+        self._extra = None
+        if fields:
+            self.update(fields)
+        if kwargs:
+            self.update(kwargs)
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "Station":
+        return cls(payload)
+
+    def __getitem__(self, key: str):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value) -> None:
+        if key in _FIELD_SET:
+            setattr(self, key, _intern(key, value))
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        try:
+            if key in _FIELD_SET:
+                delattr(self, key)
+            elif self._extra is not None:
+                del self._extra[key]
+            else:
+                raise KeyError(key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Station):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Station({self.to_dict()!r})"
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def update(self, fields: dict) -> None:
+        for key, value in fields.items():
+            self[key] = value
+
+    def keys(self):
+        keys = [field for field in STATION_FIELDS if hasattr(self, field)]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+
+def station_object_hook(payload: dict):
+    if "stationuuid" in payload:
+        return Station.from_dict(payload)
+    return payload
+
+
+def to_plain(station) -> dict:
+    return station.to_dict() if isinstance(station, Station) else station
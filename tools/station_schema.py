@@ -0,0 +1,156 @@
+import re
+
+REGIONS = (
+    "Attica",
+    "Central Macedonia",
+    "Western Macedonia",
+    "Eastern Macedonia and Thrace",
+    "Thessaly",
+    "Epirus",
+    "Western Greece",
+    "Central Greece",
+    "Peloponnese",
+    "North Aegean",
+    "South Aegean",
+    "Ionian Islands",
+    "Crete",
+)
+
+SLUG_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+
+
+def _required_str(value) -> str | None:
+    if not isinstance(value, str) or not value.strip():
+        return "must be a non-empty string"
+    return None
+
+
+def _optional_str(value) -> str | None:
+    if value is not None and not isinstance(value, str):
+        return "must be a string or null"
+    return None
+
+
+def _pattern(regex: re.Pattern, label: str):
+    def check(value) -> str | None:
+        if not isinstance(value, str) or not regex.fullmatch(value):
+            return f"must be {label}"
+        return None
+
+    return check
+
+
+def _optional_pattern(regex: re.Pattern, label: str):
+    def check(value) -> str | None:
+        if value in (None, ""):
+            return None
+        if not isinstance(value, str) or not regex.fullmatch(value):
+            return f"must be {label} or null"
+        return None
+
+    return check
+
+
+def _optional_int(minimum: int | None = None):
+    def check(value) -> str | None:
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, int):
+            return "must be an integer or null"
+        if minimum is not None and value < minimum:
+            return f"must be >= {minimum}"
+        return None
+
+    return check
+
+
+def _flag(value) -> str | None:
+    if value not in (0, 1) or isinstance(value, bool):
+        return "must be 0 or 1"
+    return None
+
+
+def _coordinate(limit: float):
+    def check(value) -> str | None:
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return "must be a number or null"
+        if not -limit <= value <= limit:
+            return f"must be within ±{limit:g}"
+        return None
+
+    return check
+
+
+def _region(regions: frozenset):
+    def check(value) -> str | None:
+        if value is None or value in regions:
+            return None
+        return "must be null or one of the region names"
+
+    return check
+
+
+def _genres(value) -> str | None:
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        return "must be a list of strings"
+    return None
+
+
+def compile_checks(regions=REGIONS) -> tuple:
+    # Built once per run; validate() then only walks (field, check) pairs per record.
+    return (
+        ("slug", _pattern(SLUG_RE, "a lowercase-hyphen slug")),
+        ("stationuuid", _pattern(UUID_RE, "a lowercase UUID")),
+        ("name", _required_str),
+        ("state", _region(frozenset(regions))),
+        ("country", _optional_str),
+        ("city", _optional_str),
+        ("countrycode", _optional_str),
+        ("stream_url", _pattern(URL_RE, "an http(s) URL")),
+        ("homepage", _optional_pattern(URL_RE, "an http(s) URL")),
+        ("favicon", _optional_str),
+        ("genres", _genres),
+        ("language", _optional_str),
+        ("bitrate", _optional_int(0)),
+        ("codec", _optional_str),
+        ("clickcount", _optional_int(0)),
+        ("lastcheckok", _flag),
+        ("votes", _optional_int(0)),
+        ("hls", _flag),
+        ("ssl_error", _flag),
+        ("geo_lat", _coordinate(90)),
+        ("geo_long", _coordinate(180)),
+    )
+
+
+def validate(stations, checks=None):
+    checks = checks or compile_checks()
+    seen_ids: set = set()
+    seen_slugs: set = set()
+    for index, station in enumerate(stations):
+        if not isinstance(station, dict) and not hasattr(station, "get"):
+            yield (f"#{index}", None, "record must be an object")
+            continue
+        station_id = station.get("stationuuid") or f"#{index}"
+        for field, check in checks:
+            if field not in station:
+                yield (station_id, field, "is missing")
+                continue
+            problem = check(station.get(field))
+            if problem:
+                yield (station_id, field, problem)
+
+        if (station.get("geo_lat") is None) != (station.get("geo_long") is None):
+            yield (station_id, "geo_lat", "geo_lat and geo_long must both be set or both be null")
+        if station_id in seen_ids:
+            yield (station_id, "stationuuid", "is duplicated")
+        seen_ids.add(station_id)
+        slug = station.get("slug")
+        if isinstance(slug, str):
+            if slug in seen_slugs:
+                yield (station_id, "slug", f"'{slug}' is duplicated")
+            seen_slugs.add(slug)
@@ -0,0 +1,165 @@
+import json
+import re
+from pathlib import Path
+
+from dataset_io import atomic_write_text, read_json_recovering
+from station_json import dumps_stations
+from station_record import station_object_hook
+from station_store import PatchJournal, StationStore
+
+SHARDS_DIR = Path("src/data/shards")
+MANIFEST_NAME = "manifest.json"
+UNASSIGNED = "_unassigned"
+MANIFEST_VERSION = 1
+
+
+def shard_slug(value) -> str:
+    if not isinstance(value, str) or not value.strip():
+        return UNASSIGNED
+    if value.strip() == UNASSIGNED:
+        # Let --region/--country take the manifest's own key back; slugging would strip the underscore.
+        return UNASSIGNED
+    slug = re.sub(r"[^\w]+", "-", value.strip().lower()).strip("-_")
+    return slug or UNASSIGNED
+
+
+def shard_name(station) -> str:
+    country = shard_slug(station.get("countrycode"))
+    return f"{country}/{shard_slug(station.get('state'))}.json"
+
+
+def dump_stations(stations) -> str:
+    return dumps_stations(stations)
+
+
+def _shard_entry(name: str, stations: list, positions: list[int]) -> dict:
+    country, region = name[: -len(".json")].split("/", 1)
+    states = sorted({station.get("state") for station in stations if isinstance(station.get("state"), str)})
+    return {"countrycode": country, "region": region, "states": states, "count": len(stations), "positions": positions}
+
+
+def read_manifest(root: Path) -> dict:
+    path = root / MANIFEST_NAME
+    if not path.exists():
+        raise FileNotFoundError(f"Shard manifest not found: {path}")
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported shard manifest version in {path}: {manifest.get('version')}")
+    return manifest
+
+
+def write_manifest(root: Path, manifest: dict) -> None:
+    manifest["shards"] = dict(sorted(manifest["shards"].items()))
+    manifest["total"] = sum(entry["count"] for entry in manifest["shards"].values())
+    atomic_write_text(root / MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2) + "\n")
+
+
+def split_dataset(stations, root: Path = SHARDS_DIR) -> dict:
+    groups: dict[str, list] = {}
+    positions: dict[str, list[int]] = {}
+    for position, station in enumerate(stations):
+        name = shard_name(station)
+        groups.setdefault(name, []).append(station)
+        positions.setdefault(name, []).append(position)
+
+    root.mkdir(parents=True, exist_ok=True)
+    previous = set()
+    if (root / MANIFEST_NAME).exists():
+        previous = set(read_manifest(root)["shards"])
+    for name, members in groups.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(path, dump_stations(members))
+    for name in previous - set(groups):
+        (root / name).unlink(missing_ok=True)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "shards": {name: _shard_entry(name, members, positions[name]) for name, members in groups.items()},
+    }
+    write_manifest(root, manifest)
+    return manifest
+
+
+def merge_dataset(root: Path = SHARDS_DIR) -> list:
+    manifest = read_manifest(root)
+    slots: list = [None] * manifest["total"]
+    for name, entry in manifest["shards"].items():
+        members = json.loads((root / name).read_text(encoding="utf-8"))
+        if len(members) != len(entry["positions"]):
+            raise ValueError(f"Shard {name} has {len(members)} stations, manifest expects {len(entry['positions'])}")
+        for position, station in zip(entry["positions"], members):
+            slots[position] = station
+    if any(station is None for station in slots):
+        raise ValueError(f"Shard manifest in {root} has gaps in station positions")
+    return slots
+
+
+def select_shards(manifest: dict, countries=None, regions=None) -> list[str]:
+    wanted_countries = {shard_slug(value) for value in countries} if countries else None
+    wanted_regions = {shard_slug(value) for value in regions} if regions else None
+    selected = []
+    for name, entry in manifest["shards"].items():
+        if wanted_countries is not None and entry["countrycode"] not in wanted_countries:
+            continue
+        if wanted_regions is not None and entry["region"] not in wanted_regions:
+            continue
+        selected.append(name)
+    return selected
+
+
+class ShardedStationStore(StationStore):
+    partial = True
+
+    @classmethod
+    def load_shards(
+        cls,
+        root: Path = SHARDS_DIR,
+        countries=None,
+        regions=None,
+        journal: PatchJournal | None = None,
+    ) -> "ShardedStationStore":
+        manifest = read_manifest(root)
+        names = select_shards(manifest, countries, regions)
+        loaded = []
+        for name in names:
+            members = read_json_recovering(root / name, object_hook=station_object_hook)
+            loaded.extend(zip(manifest["shards"][name]["positions"], members))
+        loaded.sort(key=lambda item: item[0])
+
+        store = cls([station for _, station in loaded], root / MANIFEST_NAME)
+        store.root = root
+        store.manifest = manifest
+        store.loaded_shards = set(names)
+        store.global_positions = {station.get("stationuuid"): position for position, station in loaded}
+        if journal is not None:
+            store._attach_journal(journal)
+        return store
+
+    def save(self) -> None:
+        # Records may have moved between shards (e.g. state filled in); regroup by their current key.
+        manifest = self.manifest
+        groups: dict[str, list[tuple[int, object]]] = {name: [] for name in self.loaded_shards}
+        for station in self.stations:
+            position = self.global_positions[station.get("stationuuid")]
+            groups.setdefault(shard_name(station), []).append((position, station))
+
+        for name, members in groups.items():
+            if name not in self.loaded_shards and name in manifest["shards"]:
+                # A station moved into a shard this run did not open: keep that shard's own records.
+                existing = json.loads((self.root / name).read_text(encoding="utf-8"))
+                for position, station in zip(manifest["shards"][name]["positions"], existing):
+                    if station.get("stationuuid") not in self.global_positions:
+                        members.append((position, station))
+            members.sort(key=lambda item: item[0])
+            path = self.root / name
+            if not members:
+                path.unlink(missing_ok=True)
+                manifest["shards"].pop(name, None)
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            stations = [station for _, station in members]
+            atomic_write_text(path, dump_stations(stations))
+            manifest["shards"][name] = _shard_entry(name, stations, [position for position, _ in members])
+
+        write_manifest(self.root, manifest)
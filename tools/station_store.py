@@ -0,0 +1,386 @@
+import json
+import time
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from dataset_io import atomic_write_text, iter_stations, read_json_recovering, rewrite_stations
+from parse_cache import read_cache, write_cache
+from station_json import EncodedCache
+from station_record import station_object_hook
+
+DATA_PATH = Path("src/data/stations-gr.json")
+
+MISSING_FIELDS = ("state", "city", "geo")
+DEFAULT_FLUSH_EVERY = 50
+DEFAULT_FLUSH_INTERVAL = 60.0
+# Bump whenever Station or the StationStore index layout changes.
+CACHE_VERSION = 1
+_CACHED_STATE = ("stations", "_position", "_by_uuid", "_by_slug", "_by_stream", "_missing")
+
+
+def is_blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def normalize_stream_url(value) -> str:
+    if not isinstance(value, str):
+        return ""
+    url = value.strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, parts.fragment))
+
+
+def field_missing(station: dict, field: str) -> bool:
+    if field == "geo":
+        return is_blank(station.get("geo_lat")) or is_blank(station.get("geo_long"))
+    return is_blank(station.get(field))
+
+
+def journal_path_for(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.journal.jsonl")
+
+
+def add_store_arguments(parser) -> None:
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=DEFAULT_FLUSH_EVERY,
+        help=f"Compact journaled updates into the data file every N changes (default: {DEFAULT_FLUSH_EVERY})",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=DEFAULT_FLUSH_INTERVAL,
+        help=f"Compact journaled updates at least every N seconds (default: {DEFAULT_FLUSH_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream stations from disk instead of loading the whole dataset into memory",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not write the binary parse cache next to the data file",
+    )
+    parser.add_argument(
+        "--shards",
+        type=Path,
+        help="Work on a sharded dataset directory (see tools/shard-stations.py) instead of the data file",
+    )
+    parser.add_argument("--country", action="append", help="With --shards: only load this countrycode (can be repeated)")
+    parser.add_argument("--region", action="append", help="With --shards: only load this state/region (can be repeated)")
+    parser.add_argument(
+        "--db",
+        type=Path,
+        help="Work on the SQLite mirror from tools/station-db.py import instead of the data file (export it afterwards)",
+    )
+
+
+def open_store(path: Path, args):
+    shards = getattr(args, "shards", None)
+    db = getattr(args, "db", None)
+    if db is not None:
+        if shards is not None or getattr(args, "stream", False):
+            raise SystemExit("--db cannot be combined with --shards or --stream")
+        from station_db import StationDBStore
+
+        return StationDBStore.open(db)
+    if shards is not None:
+        from station_shards import MANIFEST_NAME, ShardedStationStore
+
+        journal = PatchJournal.for_dataset(shards / MANIFEST_NAME, args.flush_every, args.flush_interval)
+        return ShardedStationStore.load_shards(shards, args.country, args.region, journal)
+    journal = PatchJournal.for_dataset(path, args.flush_every, args.flush_interval)
+    if getattr(args, "stream", False):
+        return StreamingStationStore(path, journal)
+    return StationStore.load(path, journal, use_cache=not getattr(args, "no_cache", False))
+
+
+class PatchJournal:
+    def __init__(
+        self,
+        path: Path,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = 0
+        self._last_compact = time.monotonic()
+        self._handle = None
+
+    @classmethod
+    def for_dataset(cls, path: Path, flush_every: int = DEFAULT_FLUSH_EVERY, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        return cls(journal_path_for(path), flush_every, flush_interval)
+
+    def entries(self):
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave the last line half-written; anything after it is unusable.
+                    break
+                if isinstance(entry, dict) and "stationuuid" in entry and "field" in entry:
+                    yield entry
+
+    def append(self, station_id: str, changes: dict) -> None:
+        if self._handle is None:
+            self._handle = self.path.open("a", encoding="utf-8")
+        for field, value in changes.items():
+            line = json.dumps({"stationuuid": station_id, "field": field, "value": value}, ensure_ascii=False)
+            self._handle.write(line + "\n")
+        self._handle.flush()
+        self.pending += len(changes)
+
+    def due(self) -> bool:
+        if not self.pending:
+            return False
+        if self.flush_every > 0 and self.pending >= self.flush_every:
+            return True
+        return self.flush_interval >= 0 and time.monotonic() - self._last_compact >= self.flush_interval
+
+    def clear(self, keep=()) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if keep:
+            lines = (json.dumps(entry, ensure_ascii=False) + "\n" for entry in keep)
+            atomic_write_text(self.path, "".join(lines))
+        else:
+            self.path.unlink(missing_ok=True)
+        self.pending = 0
+        self._last_compact = time.monotonic()
+
+
+class _JournaledStore:
+    journal: PatchJournal | None = None
+    # Journal entries for stations this store did not load (partial shard loads); kept across compaction.
+    journal_orphans: tuple = ()
+
+    def save(self) -> None:
+        raise NotImplementedError
+
+    def record_status(self, station_id: str, status: str | None) -> None:
+        # Only the SQLite store keeps enrichment statuses; the JSON stores leave them to the progress files.
+        pass
+
+    def checkpoint(self) -> None:
+        if self.journal is None:
+            self.save()
+        elif self.journal.due():
+            self.compact()
+
+    def compact(self) -> None:
+        if self.journal is None:
+            self.save()
+            return
+        if not self.journal.pending:
+            return
+        self.save()
+        self.journal.clear(keep=self.journal_orphans)
+
+
+class StationStore(_JournaledStore):
+    use_cache = False
+    partial = False
+
+    def __init__(self, stations: list[dict], path: Path = DATA_PATH, journal: PatchJournal | None = None):
+        self.path = path
+        self.stations = stations
+        self.journal = None
+        self._position: dict[str, int] = {}
+        self._by_uuid: dict[str, dict] = {}
+        self._by_slug: dict[str, dict] = {}
+        self._by_stream: dict[str, list[dict]] = {}
+        self._missing: dict[str, set[str]] = {field: set() for field in MISSING_FIELDS}
+        self._encoded = EncodedCache()
+        for index, station in enumerate(stations):
+            self._index(station, index)
+        if journal is not None:
+            self._attach_journal(journal)
+
+    @classmethod
+    def load(cls, path: Path = DATA_PATH, journal: PatchJournal | None = None, use_cache: bool = False) -> "StationStore":
+        state = read_cache(path, CACHE_VERSION) if use_cache else None
+        if state is None:
+            store = cls(read_json_recovering(path, object_hook=station_object_hook), path)
+            if use_cache:
+                write_cache(path, store._cache_state(), CACHE_VERSION)
+        else:
+            store = cls.__new__(cls)
+            store.__dict__.update(state)
+            store.path = path
+            store.journal = None
+            store._encoded = EncodedCache()
+        store.use_cache = use_cache
+        if journal is not None:
+            store._attach_journal(journal)
+        return store
+
+    def _cache_state(self) -> dict:
+        return {name: getattr(self, name) for name in _CACHED_STATE}
+
+    def _attach_journal(self, journal: PatchJournal) -> None:
+        replayed = 0
+        orphans = []
+        for entry in journal.entries():
+            station = self.get(entry["stationuuid"])
+            if station is not None:
+                self.update(station, **{entry["field"]: entry.get("value")})
+                replayed += 1
+            elif self.partial:
+                orphans.append(entry)
+        self.journal_orphans = tuple(orphans)
+        if replayed:
+            print(f"Recovered {replayed} journaled change(s) from {journal.path}")
+        journal.pending = replayed
+        self.journal = journal
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def __iter__(self):
+        return iter(self.stations)
+
+    def _index(self, station: dict, index: int) -> None:
+        station_id = station.get("stationuuid")
+        self._position[station_id] = index
+        self._by_uuid[station_id] = station
+        slug = station.get("slug")
+        if slug:
+            self._by_slug[slug] = station
+        self._by_stream.setdefault(normalize_stream_url(station.get("stream_url")), []).append(station)
+        for field in MISSING_FIELDS:
+            if field_missing(station, field):
+                self._missing[field].add(station_id)
+
+    def get(self, station_id: str) -> dict | None:
+        return self._by_uuid.get(station_id)
+
+    def get_by_slug(self, slug: str) -> dict | None:
+        return self._by_slug.get(slug)
+
+    def find_by_stream_url(self, url: str) -> list[dict]:
+        return list(self._by_stream.get(normalize_stream_url(url), ()))
+
+    def stream_groups(self) -> dict[str, list[dict]]:
+        return self._by_stream
+
+    def position(self, station_id: str) -> int:
+        return self._position[station_id]
+
+    def missing(self, *fields: str) -> list[dict]:
+        ids = set()
+        for field in fields:
+            ids |= self._missing[field]
+        return [self._by_uuid[station_id] for station_id in sorted(ids, key=self._position.__getitem__)]
+
+    def count_missing(self, field: str) -> int:
+        return len(self._missing[field])
+
+    def update(self, station: dict, **fields) -> dict:
+        changed = {}
+        for key, value in fields.items():
+            if station.get(key) != value:
+                changed[key] = value
+        if not changed:
+            return changed
+
+        station_id = station.get("stationuuid")
+        self._encoded.invalidate(station)
+        if "slug" in changed:
+            old_slug = station.get("slug")
+            if old_slug and self._by_slug.get(old_slug) is station:
+                del self._by_slug[old_slug]
+        if "stream_url" in changed:
+            old_key = normalize_stream_url(station.get("stream_url"))
+            group = self._by_stream.get(old_key, [])
+            group[:] = [item for item in group if item is not station]
+            if not group:
+                self._by_stream.pop(old_key, None)
+
+        station.update(changed)
+
+        if "slug" in changed and station.get("slug"):
+            self._by_slug[station["slug"]] = station
+        if "stream_url" in changed:
+            self._by_stream.setdefault(normalize_stream_url(station.get("stream_url")), []).append(station)
+        for field in MISSING_FIELDS:
+            if field_missing(station, field):
+                self._missing[field].add(station_id)
+            else:
+                self._missing[field].discard(station_id)
+        if self.journal is not None:
+            self.journal.append(station_id, changed)
+        return changed
+
+    def dumps(self) -> str:
+        return self._encoded.dumps(self.stations)
+
+    def save(self) -> None:
+        atomic_write_text(self.path, self.dumps(), keep_backup=True)
+        if self.use_cache:
+            write_cache(self.path, self._cache_state(), CACHE_VERSION)
+
+
+class StreamingStationStore(_JournaledStore):
+    def __init__(self, path: Path = DATA_PATH, journal: PatchJournal | None = None):
+        self.path = path
+        # Only changed fields are held in memory; records themselves are re-read from disk.
+        self._changes: dict[str, dict] = {}
+        self.journal = None
+        if journal is not None:
+            for entry in journal.entries():
+                self._changes.setdefault(entry["stationuuid"], {})[entry["field"]] = entry.get("value")
+            journal.pending = sum(len(changes) for changes in self._changes.values())
+            if journal.pending:
+                print(f"Recovered {journal.pending} journaled change(s) from {journal.path}")
+            self.journal = journal
+
+    def _apply(self, station: dict) -> dict:
+        changes = self._changes.get(station.get("stationuuid"))
+        if changes:
+            station.update(changes)
+        return station
+
+    def __iter__(self):
+        for station in iter_stations(self.path):
+            yield self._apply(station)
+
+    def get(self, station_id: str) -> dict | None:
+        for station in self:
+            if station.get("stationuuid") == station_id:
+                return station
+        return None
+
+    def missing(self, *fields: str):
+        for station in self:
+            if any(field_missing(station, field) for field in fields):
+                yield station
+
+    def update(self, station: dict, **fields) -> dict:
+        changed = {key: value for key, value in fields.items() if station.get(key) != value}
+        if not changed:
+            return changed
+        station_id = station.get("stationuuid")
+        station.update(changed)
+        self._changes.setdefault(station_id, {}).update(changed)
+        if self.journal is not None:
+            self.journal.append(station_id, changed)
+        return changed
+
+    def save(self) -> None:
+        rewrite_stations(self.path, self._apply)
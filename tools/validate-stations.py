@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from dataset_io import iter_json_array
+from station_schema import REGIONS, compile_checks, validate
+from station_store import DATA_PATH
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate the station dataset against the fields the pages rely on.")
+    parser.add_argument("--data", type=Path, default=DATA_PATH, help=f"Station JSON path (default: {DATA_PATH})")
+    parser.add_argument("--limit", type=int, default=50, help="Max violations to print (0 = all, default: 50)")
+    parser.add_argument("--json", action="store_true", help="Print violations as JSON lines")
+    args = parser.parse_args()
+
+    if not args.data.exists():
+        print(f"Data file not found: {args.data}")
+        return 1
+
+    violations = 0
+    stations = 0
+
+    def counted():
+        nonlocal stations
+        # Raw records, not iter_stations(): non-object entries must reach validate() to be reported.
+        for record in iter_json_array(args.data):
+            stations += 1
+            yield record
+
+    try:
+        for station_id, field, problem in validate(counted(), compile_checks(REGIONS)):
+            violations += 1
+            if args.limit and violations > args.limit:
+                continue
+            if args.json:
+                print(json.dumps({"stationuuid": station_id, "field": field, "problem": problem}, ensure_ascii=False))
+            else:
+                print(f"{station_id}: {field} {problem}" if field else f"{station_id}: {problem}")
+    except ValueError as exc:
+        print(f"{args.data} is not valid JSON: {exc}", file=sys.stderr)
+        return 1
+
+    if args.limit and violations > args.limit:
+        print(f"... {violations - args.limit} more")
+    print(f"Checked {stations} stations: {violations} violation(s).", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+from collections import deque
+
+DEFAULT_ORDER = "popularity"
+
+
+def _count(station, field: str) -> int:
+    value = station.get(field)
+    if isinstance(value, bool) or not isinstance(value, int):
+        return 0
+    return value
+
+
+# Sort keys for pending work; sorted() is stable, so ties keep dataset order.
+ORDER_POLICIES = {
+    "file": None,
+    "popularity": lambda station: (-_count(station, "lastcheckok"), -_count(station, "clickcount"), -_count(station, "votes")),
+    "clicks": lambda station: (-_count(station, "clickcount"), -_count(station, "votes")),
+    "votes": lambda station: (-_count(station, "votes"), -_count(station, "clickcount")),
+}
+
+
+def add_order_argument(parser) -> None:
+    parser.add_argument(
+        "--order",
+        choices=tuple(ORDER_POLICIES),
+        default=DEFAULT_ORDER,
+        help=(
+            "Order pending stations by: popularity (online first, then clicks, then votes), clicks, votes, "
+            f"or file (dataset order). Default: {DEFAULT_ORDER}"
+        ),
+    )
+
+
+def resolve_order(args) -> str:
+    # Sorting holds every pending station in memory, which --stream exists to avoid.
+    if getattr(args, "stream", False) and args.order != "file":
+        print(f"--stream keeps dataset order; ignoring --order {args.order}")
+        return "file"
+    return args.order
+
+
+def prioritize(stations, order: str = "file"):
+    key = ORDER_POLICIES[order]
+    if key is None:
+        return stations
+    return sorted(stations, key=key)
+
+
+class WorkQueue:
+    # Built once per run in priority order; consuming it replaces rescanning the station list per step.
+    # A streaming queue pulls stations from the candidates on demand, in dataset order, and has no length.
+    def __init__(self, stations=(), streaming: bool = False):
+        self.streaming = streaming
+        self._items = iter(stations) if streaming else deque(stations)
+
+    @classmethod
+    def build(cls, candidates, is_pending, order: str = "file", streaming: bool = False) -> "WorkQueue":
+        pending = (station for station in candidates if is_pending(station))
+        if streaming:
+            return cls(pending, streaming=True)
+        return cls(prioritize(pending, order))
+
+    @classmethod
+    def from_args(cls, candidates, is_pending, args) -> "WorkQueue":
+        return cls.build(candidates, is_pending, resolve_order(args), getattr(args, "stream", False))
+
+    def describe(self) -> str:
+        if self.streaming:
+            return "Stations pending: streamed in dataset order"
+        return f"Stations pending: {len(self._items)}"
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def pop(self):
+        if self.streaming:
+            return next(self._items, None)
+        return self._items.popleft() if self._items else None